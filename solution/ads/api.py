@@ -1,21 +1,47 @@
 import uuid
 from http import HTTPStatus as status
 
-from django.db.models import Q
-from django.http import HttpRequest
+from django.db import connection, transaction
+from django.db.models import F
+from django.http import Http404, HttpRequest
 from django.shortcuts import get_object_or_404
 from ninja import Router
 
 from ads import schemas
-from ads.score import select_best_campaign
+from ads.buffer import impression_buffer
+from ads.index import campaign_index
+from ads.ranking import ranking_cache
+from ads.score import get_ml_scores, select_best_campaign
+from ads.seen import (
+    get_seen_campaign_ids,
+    get_seen_campaign_ids_by_client,
+    has_seen,
+)
 from ads_platform import error_schemas, errors
-from advertisers.models import Campaign
+from advertisers.cache import incr_impressions_count, load_impressions_counts
+from advertisers.models import Campaign, Click, ClickArchive, Impression
+from clients.cache import client_cache
 from clients.models import Client
-from stats import metrics
 from time_emulation.cache import get_date
 
 router = Router(tags=["Ads"])
 
+CLICK_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))"
+
+
+def serve_campaign(
+    client: Client, campaign: Campaign, current_date: int
+) -> Impression:
+    incr_impressions_count(campaign)
+
+    return Impression(
+        client=client,
+        campaign=campaign,
+        advertiser_id=campaign.advertiser_id,
+        date=current_date,
+        cost=campaign.cost_per_impression,
+    )
+
 
 @router.get(
     "",
@@ -25,67 +51,97 @@ router = Router(tags=["Ads"])
     },
 )
 def get_ads(request: HttpRequest, client_id: uuid.UUID):
-    client = get_object_or_404(Client, id=client_id)
+    client = client_cache.get(client_id)
+    if client is None:
+        raise Http404
     current_date = get_date()
 
-    campaigns = Campaign.objects.filter(
-        Q(targeting__isnull=True)
-        | (
-            Q(targeting__gender__isnull=True)
-            | Q(targeting__gender="ALL")
-            | Q(targeting__gender=client.gender)
-        ),
-        (
-            Q(targeting__age_from__isnull=True)
-            | Q(targeting__age_from__lte=client.age)
-        ),
-        (
-            Q(targeting__age_to__isnull=True)
-            | Q(targeting__age_to__gte=client.age)
-        ),
-        (
-            Q(targeting__location__isnull=True)
-            | Q(targeting__location__exact=client.location)
-        ),
-        start_date__lte=current_date,
-        end_date__gte=current_date,
+    candidates = ranking_cache.get(client)
+    seen = get_seen_campaign_ids(
+        client.id, [campaign.id for campaign in candidates.campaigns]
+    )
+    load_impressions_counts(
+        [
+            campaign
+            for campaign in candidates.campaigns
+            if campaign.id not in seen
+        ]
     )
 
-    if not campaigns:
-        return status.NOT_FOUND, error_schemas.NotFoundError()
-
-    best_campaign = select_best_campaign(client, campaigns, current_date)
+    best_campaign = candidates.select_best(current_date, exclude=seen)
 
     if not best_campaign:
         return status.NOT_FOUND, error_schemas.NotFoundError()
 
-    best_campaign.impressions_count += 1
-    best_campaign.impressions.add(
-        client,
-        through_defaults={
-            "date": current_date,
-            "cost": best_campaign.cost_per_impression,
-        },
+    impression_buffer.add(
+        [serve_campaign(client, best_campaign, current_date)]
     )
-    best_campaign.save()
-
-    metrics.campaign_impressions.labels(campaign_id=best_campaign.id).inc(1)
-    metrics.campaign_daily_impressions.labels(
-        campaign_id=best_campaign.id,
-        date=get_date(),
-    ).inc(1)
-
-    metrics.advertiser_impressions.labels(
-        advertiser_id=best_campaign.advertiser.id
-    ).inc(1)
-    metrics.advertiser_daily_impressions.labels(
-        advertiser_id=best_campaign.advertiser.id,
-        date=get_date(),
-    ).inc(1)
 
     return best_campaign
 
 
+@router.post(
+    "/batch",
+    response={
+        status.OK: list[schemas.AdsBatchOut],
+        status.BAD_REQUEST: error_schemas.ValidationError,
+    },
+    exclude_none=True,
+    description=(
+        "Подбор рекламы для нескольких клиентов за один запрос. "
+        "Для неизвестных клиентов и клиентов без подходящей рекламы "
+        "поле ad не возвращается"
+    ),
+)
+def get_ads_batch(request: HttpRequest, payload: schemas.AdsBatchIn):
+    current_date = get_date()
+    client_ids = list(dict.fromkeys(payload.client_ids))
+    clients = Client.objects.in_bulk(client_ids)
+
+    candidates = {
+        client.id: campaign_index.candidates(client)
+        for client in clients.values()
+    }
+    seen = get_seen_campaign_ids_by_client(candidates)
+
+    campaigns = Campaign.objects.filter(
+        id__in=set().union(*candidates.values())
+    ).select_related("advertiser")
+    campaigns = {campaign.id: campaign for campaign in campaigns}
+    load_impressions_counts(list(campaigns.values()))
+
+    ml_scores = get_ml_scores(
+        clients.keys(),
+        {campaign.advertiser_id for campaign in campaigns.values()},
+    )
+
+    response, impressions = [], []
+    for client_id in client_ids:
+        client, best_campaign = clients.get(client_id), None
+        client_campaigns = [
+            campaigns[campaign_id]
+            for campaign_id in candidates.get(client_id, set())
+            - seen.get(client_id, set())
+            if campaign_id in campaigns
+        ]
+
+        if client_campaigns:
+            best_campaign = select_best_campaign(
+                client, client_campaigns, current_date, ml_scores
+            )
+
+        if best_campaign:
+            impressions.append(
+                serve_campaign(client, best_campaign, current_date)
+            )
+
+        response.append({"client_id": client_id, "ad": best_campaign})
+
+    impression_buffer.add(impressions)
+
+    return response
+
+
 @router.post(
     "/{ad_id}/click",
     response={
@@ -102,25 +158,39 @@ def click(
     payload: schemas.AdsClickIn,
 ):
     campaign = get_object_or_404(Campaign, id=ad_id)
-    client = get_object_or_404(Client, id=payload.client_id)
+    client = client_cache.get(payload.client_id)
+    if client is None:
+        raise Http404
 
-    if client not in campaign.impressions.all():
+    if not has_seen(client.id, campaign.id):
         raise errors.ForbiddenError()  # noqa: RSE102
 
-    if client not in campaign.clicks.all():
-        campaign.clicks_count += 1
-        campaign.clicks.add(
-            client,
-            through_defaults={
-                "date": get_date(),
-                "cost": campaign.cost_per_click,
-            },
-        )
-        campaign.save()
-        metrics.campaign_impressions.labels(campaign_id=ad_id).inc(1)
-        metrics.campaign_daily_clicks.labels(
-            campaign_id=ad_id,
+    with transaction.atomic():
+        # Click is partitioned by date, so a unique (client, campaign)
+        # constraint is not possible; a lock on the pair makes the check
+        # and the insert atomic without serializing the whole campaign.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                CLICK_LOCK_SQL, [f"click:{client.id}:{campaign.id}"]
+            )
+
+        if (
+            Click.objects.filter(client=client, campaign=campaign).exists()
+            or ClickArchive.objects.filter(
+                client=client, campaign=campaign
+            ).exists()
+        ):
+            return status.NO_CONTENT, None
+
+        Click.objects.create(
+            client=client,
+            campaign=campaign,
+            advertiser_id=campaign.advertiser_id,
             date=get_date(),
-        ).inc(1)
+            cost=campaign.cost_per_click,
+        )
+        Campaign.objects.filter(id=campaign.id).update(
+            clicks_count=F("clicks_count") + 1
+        )
 
     return status.NO_CONTENT, None
@@ -0,0 +1,114 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from ads.seen import mark_pending
+from advertisers.models import Campaign, Impression
+from stats.rollup import record_impressions
+
+logger = logging.getLogger("django")
+
+
+class ImpressionBuffer:
+    """
+    Write-behind buffer for served impressions.
+
+    Impressions are persisted with one bulk insert once the buffer holds
+    IMPRESSIONS_BUFFER_SIZE rows or IMPRESSIONS_BUFFER_MAX_DELAY seconds
+    after the first buffered row, whichever comes first, and the buffer is
+    drained when the worker exits. A batch that fails to save is put back
+    and retried by the timer instead of failing the request that
+    triggered the flush.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._impressions = []
+        self._timer = None
+
+    def add(self, impressions: list[Impression]):
+        if not impressions:
+            return
+
+        if settings.IMPRESSIONS_BUFFER_SIZE <= 1:
+            self._save(impressions)
+            return
+
+        mark_pending(impressions)
+
+        with self._lock:
+            self._impressions.extend(impressions)
+            is_full = (
+                len(self._impressions) >= settings.IMPRESSIONS_BUFFER_SIZE
+            )
+
+            if not is_full:
+                self._schedule()
+
+        if is_full:
+            self.flush()
+
+    def _schedule(self) -> None:
+        if self._timer is None:
+            self._timer = threading.Timer(
+                settings.IMPRESSIONS_BUFFER_MAX_DELAY,
+                self._flush_in_background,
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            impressions, self._impressions = self._impressions, []
+
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not impressions:
+            return
+
+        try:
+            self._save(impressions)
+        except Exception:
+            logger.exception(
+                "Failed to save %d buffered impressions, will retry",
+                len(impressions),
+            )
+            for impression in impressions:
+                impression.pk = None
+
+            with self._lock:
+                self._impressions[:0] = impressions
+                self._schedule()
+
+    def _flush_in_background(self) -> None:
+        with self._lock:
+            self._timer = None
+
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+    def _save(self, impressions: list[Impression]) -> None:
+        served = Counter(impression.campaign_id for impression in impressions)
+
+        with transaction.atomic():
+            Impression.objects.bulk_create(impressions)
+
+            for campaign_id, count in served.items():
+                Campaign.objects.filter(id=campaign_id).update(
+                    impressions_count=F("impressions_count") + count
+                )
+
+            record_impressions(impressions)
+
+
+impression_buffer = ImpressionBuffer()
+atexit.register(impression_buffer.flush)
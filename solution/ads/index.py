@@ -0,0 +1,145 @@
+import threading
+import uuid
+from collections import defaultdict
+
+from advertisers.cache import bump_campaigns_version, get_campaigns_version
+from advertisers.models import Campaign
+from clients.models import Client
+from time_emulation.cache import get_date
+
+AGE_BUCKET_SIZE = 10
+MAX_AGE = 100
+
+ANY = None
+
+
+class CampaignIndex:
+    """
+    Per-worker targeting index of the campaigns active on the current day.
+
+    The index is tagged with the day and the campaigns version it was built
+    for and is rebuilt lazily as soon as either of them changes, so every
+    worker picks up edits made through other workers.
+    """
+
+    def __init__(self) -> None:
+        self.date = None
+        self.version = None
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.age_ranges = {}
+        self.by_gender = defaultdict(set)
+        self.by_age = defaultdict(set)
+        self.by_location = defaultdict(set)
+
+    def _add(
+        self,
+        campaign_id: uuid.UUID,
+        gender: str | None,
+        age_from: int | None,
+        age_to: int | None,
+        location: str | None,
+    ) -> None:
+        age_from = 0 if age_from is None else age_from
+        age_to = MAX_AGE if age_to is None else age_to
+
+        self.age_ranges[campaign_id] = (age_from, age_to)
+        self.by_gender[ANY if gender == "ALL" else gender].add(campaign_id)
+        self.by_location[location].add(campaign_id)
+
+        for bucket in range(
+            age_from // AGE_BUCKET_SIZE,
+            min(age_to, MAX_AGE) // AGE_BUCKET_SIZE + 1,
+        ):
+            self.by_age[bucket].add(campaign_id)
+
+    def _remove(self, campaign_id: uuid.UUID) -> None:
+        if self.age_ranges.pop(campaign_id, None) is None:
+            return
+
+        for index in (self.by_gender, self.by_age, self.by_location):
+            for campaign_ids in index.values():
+                campaign_ids.discard(campaign_id)
+
+    def rebuild(self):
+        with self._lock:
+            date, version = get_date(), get_campaigns_version()
+            campaigns = Campaign.objects.filter(
+                start_date__lte=date,
+                end_date__gte=date,
+            ).values_list(
+                "id",
+                "targeting__gender",
+                "targeting__age_from",
+                "targeting__age_to",
+                "targeting__location",
+            )
+
+            self._reset()
+            for campaign in campaigns:
+                self._add(*campaign)
+
+            self.date, self.version = date, version
+
+    def update(self, campaign: Campaign):
+        version = bump_campaigns_version()
+
+        with self._lock:
+            if self.version != version - 1 or self.date != get_date():
+                self.version = None
+                return
+
+            self._remove(campaign.id)
+            if campaign.start_date <= self.date <= campaign.end_date:
+                targeting = campaign.targeting
+                self._add(
+                    campaign.id,
+                    targeting and targeting.gender,
+                    targeting and targeting.age_from,
+                    targeting and targeting.age_to,
+                    targeting and targeting.location,
+                )
+            self.version = version
+
+    def remove(self, campaign_id: uuid.UUID):
+        version = bump_campaigns_version()
+
+        with self._lock:
+            if self.version != version - 1:
+                self.version = None
+                return
+
+            self._remove(campaign_id)
+            self.version = version
+
+    def refresh(self) -> tuple[int, int]:
+        if self.date != get_date() or self.version != get_campaigns_version():
+            self.rebuild()
+
+        return self.date, self.version
+
+    def candidates(self, client: Client) -> set[uuid.UUID]:
+        self.refresh()
+
+        matched = sorted(
+            (
+                self.by_gender[ANY] | self.by_gender[client.gender],
+                self.by_location[ANY] | self.by_location[client.location],
+                self.by_age[min(client.age, MAX_AGE) // AGE_BUCKET_SIZE],
+            ),
+            key=len,
+        )
+        candidates = matched[0].intersection(*matched[1:])
+
+        return {
+            campaign_id
+            for campaign_id in candidates
+            if self.age_ranges[campaign_id][0]
+            <= client.age
+            <= self.age_ranges[campaign_id][1]
+        }
+
+
+campaign_index = CampaignIndex()
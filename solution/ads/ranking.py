@@ -0,0 +1,84 @@
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+
+from ads.index import campaign_index
+from ads.score import CandidateSet, get_ml_scores
+from advertisers.models import Campaign
+from clients.models import Client
+from score.cache import get_scores_version
+
+
+class RankingCache:
+    """
+    Per-worker LRU of the clients' candidate sets for the current day.
+
+    An entry is reused while the day, the campaigns version, the client's
+    ML scores version and the client's targeting profile stay the same.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._campaigns = {}
+        self._campaigns_state = None
+
+    def _get_campaigns(
+        self, state: tuple[int, int], campaign_ids: set[uuid.UUID]
+    ) -> list[Campaign]:
+        if state != self._campaigns_state:
+            self._campaigns, self._campaigns_state = {}, state
+
+        missing = campaign_ids - self._campaigns.keys()
+        if missing:
+            self._campaigns.update(
+                Campaign.objects.filter(id__in=missing)
+                .select_related("advertiser")
+                .in_bulk()
+            )
+
+        return [
+            self._campaigns[campaign_id]
+            for campaign_id in campaign_ids
+            if campaign_id in self._campaigns
+        ]
+
+    def get(self, client: Client) -> CandidateSet:
+        state = campaign_index.refresh()
+        key = (
+            state,
+            get_scores_version(client.id),
+            client.age,
+            client.gender,
+            client.location,
+        )
+
+        with self._lock:
+            entry = self._entries.get(client.id)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(client.id)
+                return entry[1]
+
+            campaigns = self._get_campaigns(
+                state, campaign_index.candidates(client)
+            )
+            candidates = CandidateSet(
+                client.id,
+                campaigns,
+                get_ml_scores(
+                    [client.id],
+                    {campaign.advertiser_id for campaign in campaigns},
+                ),
+            )
+
+            self._entries[client.id] = (key, candidates)
+            self._entries.move_to_end(client.id)
+            while len(self._entries) > settings.RANKING_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+        return candidates
+
+
+ranking_cache = RankingCache()
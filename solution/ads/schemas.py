@@ -1,5 +1,6 @@
 import uuid
 
+from django.conf import settings
 from ninja import Field, ModelSchema, Schema
 
 from advertisers.models import Campaign
@@ -16,3 +17,14 @@ class AdsOut(ModelSchema):
 
 class AdsClickIn(Schema):
     client_id: uuid.UUID
+
+
+class AdsBatchIn(Schema):
+    client_ids: list[uuid.UUID] = Field(
+        ..., min_length=1, max_length=settings.ADS_BATCH_MAX_CLIENTS
+    )
+
+
+class AdsBatchOut(Schema):
+    client_id: uuid.UUID
+    ad: AdsOut | None = None
@@ -1,90 +1,153 @@
-from advertisers.models import Campaign, Impression
+import uuid
+from collections.abc import Iterable
+
+import numpy as np
+
+from advertisers.models import Campaign
 from clients.models import Client
 from score.models import MLScore
 
+CAMPAIGN_COLUMNS = (
+    "impressions_count",
+    "impressions_limit",
+    "cost_per_impression",
+    "cost_per_click",
+    "start_date",
+    "end_date",
+)
 
-def linear_normalization(values: list) -> list:
-    min_v, max_v = min(values), max(values)
-    return (
-        [1.0] * len(values)
-        if min_v == max_v
-        else [(v - min_v) / (max_v - min_v) for v in values]
-    )
 
+def linear_normalization(values: np.ndarray) -> np.ndarray:
+    min_v, max_v = values.min(), values.max()
+    if min_v == max_v:
+        return np.ones_like(values, dtype=np.float64)
+    return (values - min_v) / (max_v - min_v)
 
-def max_normalization(values: list) -> list:
-    max_v = max(values) or 1
-    return [v / max_v for v in values]
 
+def max_normalization(values: np.ndarray) -> np.ndarray:
+    max_v = values.max() or 1
+    return values / max_v
 
-def select_best_campaign(
-    client: Client, campaigns: list[Campaign], current_day: int
-):
-    filtered = [
-        campaign
-        for campaign in campaigns
-        if not Impression.objects.filter(
-            client=client, campaign=campaign
-        ).exists()
-        and campaign.impressions_count <= campaign.impressions_limit * 1.03
-    ]
-
-    if not filtered:
-        return None
-
-    profits, relevances, limit_factors = [], [], []
-
-    for campaign in filtered:
-        ml_score = MLScore.objects.filter(
-            client=client,
-            advertiser=campaign.advertiser,
-        ).first()
-        relevances.append(ml_score.score if ml_score else 0)
-
-    max_ml_score = max(relevances) or 1
-
-    for i, campaign in enumerate(filtered):
-        click_prob = relevances[i] / max_ml_score
-
-        profit = float(campaign.cost_per_impression) + click_prob * float(
-            campaign.cost_per_click
-        )
-        profits.append(profit)
 
-        progress = campaign.impressions_count / (
-            campaign.impressions_limit or 1
+def to_columns(campaigns: list[Campaign]) -> dict[str, np.ndarray]:
+    return {
+        column: np.array(
+            [getattr(campaign, column) for campaign in campaigns],
+            dtype=np.float64,
         )
-        total_days = campaign.end_date - campaign.start_date + 1
-        days_left = (campaign.end_date - current_day + 1) / total_days
-
-        if progress < 0.95:
-            limit_factor = 1.0 + min(0.85, (0.95 - progress) * days_left)
-
-        elif progress <= 1.0:
-            limit_factor = 1.0
+        for column in CAMPAIGN_COLUMNS
+    }
+
+
+def score_campaigns(
+    columns: dict[str, np.ndarray],
+    relevances: np.ndarray,
+    current_day: int,
+) -> np.ndarray:
+    click_probs = relevances / (relevances.max() or 1)
+    profits = (
+        columns["cost_per_impression"]
+        + click_probs * columns["cost_per_click"]
+    )
 
-        else:
-            excess = (progress - 1.0) / 0.01
-            limit_factor = max(0, 1.0 - excess * 0.10)
+    limits = columns["impressions_limit"]
+    progress = columns["impressions_count"] / np.where(limits == 0, 1, limits)
+    total_days = columns["end_date"] - columns["start_date"] + 1
+    days_left = (columns["end_date"] - current_day + 1) / total_days
 
-        limit_factors.append(limit_factor)
+    limit_factors = np.select(
+        [progress < 0.95, progress <= 1.0],
+        [1.0 + np.minimum(0.85, (0.95 - progress) * days_left), 1.0],
+        np.maximum(0, 1.0 - (progress - 1.0) / 0.01 * 0.10),
+    )
 
-    if len(filtered) < 10:
+    if len(relevances) < 10:
         profit_norms = max_normalization(profits)
         relevance_norms = max_normalization(relevances)
     else:
         profit_norms = linear_normalization(profits)
         relevance_norms = linear_normalization(relevances)
 
-    best_campaign, best_score = None, float("-inf")
-    for i, campaign in enumerate(filtered):
-        score = (
-            0.5 * profit_norms[i]
-            + 0.25 * relevance_norms[i]
-            + 0.15 * limit_factors[i]
+    return 0.5 * profit_norms + 0.25 * relevance_norms + 0.15 * limit_factors
+
+
+def get_ml_scores(
+    client_ids: Iterable[uuid.UUID], advertiser_ids: Iterable[uuid.UUID]
+) -> dict[tuple[uuid.UUID, uuid.UUID], int]:
+    return {
+        (client_id, advertiser_id): score
+        for client_id, advertiser_id, score in MLScore.objects.filter(
+            client__in=client_ids,
+            advertiser__in=advertiser_ids,
+        ).values_list("client_id", "advertiser_id", "score")
+    }
+
+
+class CandidateSet:
+    """
+    Columnar view of a client's candidate campaigns.
+
+    Costs, limits, dates and ML relevances are fixed for the day, while
+    impressions_count is read from the campaigns on every selection so that
+    pacing always sees live counters.
+    """
+
+    def __init__(
+        self,
+        client_id: uuid.UUID,
+        campaigns: list[Campaign],
+        ml_scores: dict[tuple[uuid.UUID, uuid.UUID], int],
+    ) -> None:
+        self.campaigns = campaigns
+        self.columns = to_columns(campaigns)
+        self.relevances = np.array(
+            [
+                ml_scores.get((client_id, campaign.advertiser_id), 0)
+                for campaign in campaigns
+            ],
+            dtype=np.float64,
         )
 
-        if score > best_score:
-            best_score, best_campaign = score, campaign
+    def select_best(
+        self, current_day: int, exclude: set[uuid.UUID] = frozenset()
+    ) -> Campaign | None:
+        counts = np.array(
+            [campaign.impressions_count for campaign in self.campaigns],
+            dtype=np.float64,
+        )
+        eligible = counts <= self.columns["impressions_limit"] * 1.03
+        if exclude:
+            eligible &= np.array(
+                [campaign.id not in exclude for campaign in self.campaigns],
+                dtype=bool,
+            )
+
+        if not eligible.any():
+            return None
+
+        columns = {
+            column: values[eligible] for column, values in self.columns.items()
+        }
+        columns["impressions_count"] = counts[eligible]
+        scores = score_campaigns(
+            columns, self.relevances[eligible], current_day
+        )
+
+        return self.campaigns[int(np.flatnonzero(eligible)[scores.argmax()])]
 
-    return best_campaign
+
+def select_best_campaign(
+    client: Client,
+    campaigns: list[Campaign],
+    current_day: int,
+    ml_scores: dict[tuple[uuid.UUID, uuid.UUID], int] | None = None,
+):
+    if ml_scores is None:
+        ml_scores = get_ml_scores(
+            [client.id],
+            {campaign.advertiser_id for campaign in campaigns},
+        )
+
+    return CandidateSet(client.id, campaigns, ml_scores).select_best(
+        current_day
+    )
@@ -0,0 +1,91 @@
+import uuid
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+from advertisers.models import Impression, ImpressionArchive
+
+PENDING_TIMEOUT = 300
+
+
+def _pending_key(client_id: uuid.UUID, campaign_id: uuid.UUID) -> str:
+    return f"pending_impression:{client_id}:{campaign_id}"
+
+
+def mark_pending(impressions: list[Impression]):
+    cache.set_many(
+        {
+            _pending_key(impression.client_id, impression.campaign_id): True
+            for impression in impressions
+        },
+        timeout=PENDING_TIMEOUT,
+    )
+
+
+def get_pending_campaign_ids_by_client(
+    candidates: dict[uuid.UUID, set[uuid.UUID]],
+) -> dict[uuid.UUID, set[uuid.UUID]]:
+    pending = {client_id: set() for client_id in candidates}
+    keys = {
+        _pending_key(client_id, campaign_id): (client_id, campaign_id)
+        for client_id, campaign_ids in candidates.items()
+        for campaign_id in campaign_ids
+    }
+
+    if keys:
+        for key in cache.get_many(keys):
+            client_id, campaign_id = keys[key]
+            pending[client_id].add(campaign_id)
+
+    return pending
+
+
+def get_seen_campaign_ids_by_client(
+    candidates: dict[uuid.UUID, set[uuid.UUID]],
+) -> dict[uuid.UUID, set[uuid.UUID]]:
+    """
+    The (client_id, campaign_id) lookup has no date of its own, so it
+    probes the index of every Impression partition. No date bound is
+    safe here: a campaign's start_date moves forward on every edit, and
+    impressions served before the edit must still count as seen.
+    """
+    seen = {client_id: set() for client_id in candidates}
+    impressions = Impression.objects.filter(
+        client_id__in=candidates.keys(),
+        campaign_id__in=set().union(*candidates.values()),
+    ).values_list("client_id", "campaign_id")
+
+    for client_id, campaign_id in impressions:
+        seen[client_id].add(campaign_id)
+
+    if settings.IMPRESSIONS_BUFFER_SIZE > 1:
+        pending = get_pending_campaign_ids_by_client(
+            {
+                client_id: campaign_ids - seen[client_id]
+                for client_id, campaign_ids in candidates.items()
+            }
+        )
+        for client_id, campaign_ids in pending.items():
+            seen[client_id] |= campaign_ids
+
+    return seen
+
+
+def get_seen_campaign_ids(
+    client_id: uuid.UUID, campaign_ids: Iterable[uuid.UUID]
+) -> set[uuid.UUID]:
+    candidates = {client_id: set(campaign_ids)}
+    return get_seen_campaign_ids_by_client(candidates)[client_id]
+
+
+def has_seen(client_id: uuid.UUID, campaign_id: uuid.UUID) -> bool:
+    # Compaction moves the impressions of finished campaigns to the
+    # archive, so it is checked after the live table, which a concurrent
+    # compaction empties only once the archive is committed.
+    return (
+        bool(get_seen_campaign_ids(client_id, [campaign_id]))
+        or ImpressionArchive.objects.filter(
+            client_id=client_id, campaign_id=campaign_id
+        ).exists()
+    )
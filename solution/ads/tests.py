@@ -1,9 +1,21 @@
 from http import HTTPStatus as status
 from django import test
-from advertisers.models import Campaign, Impression
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import F
+from ads.buffer import impression_buffer
+from ads.ranking import ranking_cache
+from ads.score import select_best_campaign
+from advertisers.cache import load_impressions_counts
+from advertisers.compaction import compact_finished_campaigns
+from advertisers.models import Campaign, Click, Impression
+from clients.cache import _profile_key, _version_key, client_cache
 from clients.models import Client
 from time_emulation.cache import get_date
+import random
 import uuid
+from unittest import mock
 
 
 class AdsTest(test.TestCase):
@@ -142,6 +154,33 @@ class AdsTest(test.TestCase):
         )
         self.assertEqual(response.status_code, status.NOT_FOUND)
 
+    def test_client_profile_cache(self):
+        client_id = uuid.UUID(self.client_data["client_id"])
+        self.assertEqual(client_cache.get(client_id).location, "Moscow")
+
+        with self.assertNumQueries(0):
+            client = client_cache.get(client_id)
+        self.assertEqual((client.age, client.gender), (25, "MALE"))
+
+        self.client.post(
+            "/clients/bulk",
+            data=[{**self.client_data, "location": "Kazan"}],
+            content_type="application/json",
+        )
+        self.assertEqual(client_cache.get(client_id).location, "Kazan")
+
+    def test_client_profile_cache_ignores_stale_set(self):
+        client_id = uuid.UUID(self.client_data["client_id"])
+        version = cache.get(_version_key(client_id), default="0")
+        stale = (client_id, 25, "Moscow", "MALE")
+
+        Client.objects.filter(id=client_id).update(location="Kazan")
+        client_cache.invalidate([client_id])
+        # A reader that loaded the row before the update stores it late.
+        cache.set(_profile_key(client_id, version), stale)
+
+        self.assertEqual(client_cache.get(client_id).location, "Kazan")
+
     def test_get_ads_high_score_priority(self):
         response = self.client.get(
             f"{self.prefix}?client_id={self.client_data['client_id']}",
@@ -181,6 +220,103 @@ class AdsTest(test.TestCase):
         campaign = Campaign.objects.get(id=ad_id)
         self.assertEqual(campaign.clicks_count, 1)
 
+    def test_get_ads_not_reserved_after_campaign_edit(self):
+        response = self.client.get(
+            f"{self.prefix}?client_id={self.client_data['client_id']}",
+            content_type="application/json",
+        )
+        ad_id = response.json()["ad_id"]
+        # Served on an earlier day; editing a running campaign moves its
+        # start_date to today.
+        Impression.objects.filter(campaign_id=ad_id).update(
+            date=F("date") - 1
+        )
+        campaign_data = (
+            self.campaign_data1
+            if ad_id == self.campaign_id1
+            else self.campaign_data2
+        )
+        response = self.client.put(
+            f"/advertisers/{self.advertiser_data['advertiser_id']}"
+            f"/campaigns/{ad_id}",
+            data={**campaign_data, "ad_text": "Edited"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.OK)
+
+        response = self.client.get(
+            f"{self.prefix}?client_id={self.client_data['client_id']}",
+            content_type="application/json",
+        )
+        self.assertNotEqual(response.json()["ad_id"], ad_id)
+        self.assertEqual(
+            Impression.objects.filter(campaign_id=ad_id).count(), 1
+        )
+
+        response = self.client.post(
+            f"{self.prefix}/{ad_id}/click",
+            data={"client_id": self.client_data["client_id"]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.NO_CONTENT)
+
+    def test_click_once_across_campaign_edit(self):
+        response = self.client.get(
+            f"{self.prefix}?client_id={self.client_data['client_id']}",
+            content_type="application/json",
+        )
+        ad_id = response.json()["ad_id"]
+        self.client.post(
+            f"{self.prefix}/{ad_id}/click",
+            data={"client_id": self.client_data["client_id"]},
+            content_type="application/json",
+        )
+        # Clicked on an earlier day; the edit moves start_date to today.
+        Click.objects.filter(campaign_id=ad_id).update(date=F("date") - 1)
+        Impression.objects.filter(campaign_id=ad_id).update(
+            date=F("date") - 1
+        )
+
+        response = self.client.post(
+            f"{self.prefix}/{ad_id}/click",
+            data={"client_id": self.client_data["client_id"]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.NO_CONTENT)
+        self.assertEqual(Click.objects.filter(campaign_id=ad_id).count(), 1)
+        campaign = Campaign.objects.get(id=ad_id)
+        self.assertEqual(campaign.clicks_count, 1)
+
+    def test_click_after_compaction(self):
+        response = self.client.get(
+            f"{self.prefix}?client_id={self.client_data['client_id']}",
+            content_type="application/json",
+        )
+        ad_id = response.json()["ad_id"]
+        campaign = Campaign.objects.get(id=ad_id)
+        compaction_date = (
+            campaign.end_date + settings.COMPACTION_DELAY_DAYS + 1
+        )
+
+        compact_finished_campaigns(compaction_date)
+        response = self.client.post(
+            f"{self.prefix}/{ad_id}/click",
+            data={"client_id": self.client_data["client_id"]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.NO_CONTENT)
+
+        compact_finished_campaigns(compaction_date)
+        response = self.client.post(
+            f"{self.prefix}/{ad_id}/click",
+            data={"client_id": self.client_data["client_id"]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.NO_CONTENT)
+        self.assertFalse(Click.objects.filter(campaign_id=ad_id).exists())
+        campaign = Campaign.objects.get(id=ad_id)
+        self.assertEqual(campaign.clicks_count, 1)
+
     def test_click_invalid_ad_id(self):
         invalid_id = "invalid-id"
         response = self.client.post(
@@ -253,6 +389,26 @@ class AdsTest(test.TestCase):
         campaign = Campaign.objects.get(id=ad_id)
         self.assertEqual(campaign.clicks_count, 1)
 
+    def test_click_ignores_other_clients_clicks(self):
+        ad_response = self.client.get(
+            f"{self.prefix}?client_id={self.client_data['client_id']}",
+            content_type="application/json",
+        )
+        ad_id = ad_response.json()["ad_id"]
+        other = Client.objects.create(
+            login="other", age=30, location="Moscow", gender="MALE"
+        )
+        Click.objects.create(client=other, campaign_id=ad_id, cost=1.0)
+
+        response = self.client.post(
+            f"{self.prefix}/{ad_id}/click",
+            data={"client_id": self.client_data["client_id"]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.NO_CONTENT)
+        campaign = Campaign.objects.get(id=ad_id)
+        self.assertEqual(campaign.clicks_count, 1)
+
     def test_click_after_impression_limit(self):
         campaign = Campaign.objects.get(id=self.campaign_id1)
         campaign.impressions_count = 10
@@ -273,3 +429,327 @@ class AdsTest(test.TestCase):
         self.assertNotEqual(
             ad_id, self.campaign_id1
         )
+
+    def test_get_ads_targeting_mismatch(self):
+        client_data = {
+            "client_id": "8fa85f64-5717-4562-b3fc-2c963f66afa6",
+            "login": "user2",
+            "age": 45,
+            "location": "Kazan",
+            "gender": "FEMALE",
+        }
+        self.client.post(
+            "/clients/bulk",
+            data=[client_data],
+            content_type="application/json",
+        )
+        response = self.client.get(
+            f"{self.prefix}?client_id={client_data['client_id']}",
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.NOT_FOUND)
+
+        self.client.put(
+            f"/advertisers/{self.advertiser_data['advertiser_id']}"
+            f"/campaigns/{self.campaign_id1}",
+            data={
+                **self.campaign_data1,
+                "targeting": {"gender": "ALL", "location": "Kazan"},
+            },
+            content_type="application/json",
+        )
+        response = self.client.get(
+            f"{self.prefix}?client_id={client_data['client_id']}",
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(response.json()["ad_id"], self.campaign_id1)
+
+    def test_get_ads_skips_seen_campaigns(self):
+        url = f"{self.prefix}?client_id={self.client_data['client_id']}"
+
+        first = self.client.get(url, content_type="application/json")
+        second = self.client.get(url, content_type="application/json")
+        self.assertEqual(first.status_code, status.OK)
+        self.assertEqual(second.status_code, status.OK)
+        self.assertNotEqual(first.json()["ad_id"], second.json()["ad_id"])
+
+        response = self.client.get(url, content_type="application/json")
+        self.assertEqual(response.status_code, status.NOT_FOUND)
+
+    @test.override_settings(
+        IMPRESSIONS_BUFFER_SIZE=10, IMPRESSIONS_BUFFER_MAX_DELAY=60
+    )
+    def test_get_ads_buffered_impressions(self):
+        url = f"{self.prefix}?client_id={self.client_data['client_id']}"
+
+        first = self.client.get(url, content_type="application/json")
+        second = self.client.get(url, content_type="application/json")
+        self.assertNotEqual(first.json()["ad_id"], second.json()["ad_id"])
+        self.assertEqual(Impression.objects.count(), 0)
+
+        response = self.client.post(
+            f"{self.prefix}/{first.json()['ad_id']}/click",
+            data={"client_id": self.client_data["client_id"]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.NO_CONTENT)
+
+        impression_buffer.flush()
+        self.assertEqual(Impression.objects.count(), 2)
+        campaign = Campaign.objects.get(id=first.json()["ad_id"])
+        self.assertEqual(campaign.impressions_count, 1)
+
+    @test.override_settings(
+        IMPRESSIONS_BUFFER_SIZE=10, IMPRESSIONS_BUFFER_MAX_DELAY=60
+    )
+    def test_get_ads_live_impressions_count(self):
+        response = self.client.get(
+            f"{self.prefix}?client_id={self.client_data['client_id']}",
+            content_type="application/json",
+        )
+        campaign = Campaign.objects.get(id=response.json()["ad_id"])
+        self.assertEqual(campaign.impressions_count, 0)
+
+        load_impressions_counts([campaign])
+        self.assertEqual(campaign.impressions_count, 1)
+
+        impression_buffer.flush()
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.impressions_count, 1)
+
+    @test.override_settings(
+        IMPRESSIONS_BUFFER_SIZE=2, IMPRESSIONS_BUFFER_MAX_DELAY=60
+    )
+    def test_get_ads_buffer_keeps_failed_flush(self):
+        url = f"{self.prefix}?client_id={self.client_data['client_id']}"
+
+        with mock.patch(
+            "ads.buffer.record_impressions", side_effect=DatabaseError
+        ):
+            self.client.get(url, content_type="application/json")
+            response = self.client.get(url, content_type="application/json")
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(Impression.objects.count(), 0)
+
+        impression_buffer.flush()
+        self.assertEqual(Impression.objects.count(), 2)
+
+    def test_get_ads_batch(self):
+        client_data = {
+            "client_id": "9fa85f64-5717-4562-b3fc-2c963f66afa6",
+            "login": "user3",
+            "age": 22,
+            "location": "Moscow",
+            "gender": "MALE",
+        }
+        self.client.post(
+            "/clients/bulk",
+            data=[client_data],
+            content_type="application/json",
+        )
+        unknown_id = str(uuid.uuid4())
+
+        response = self.client.post(
+            f"{self.prefix}/batch",
+            data={
+                "client_ids": [
+                    self.client_data["client_id"],
+                    client_data["client_id"],
+                    unknown_id,
+                ]
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.OK)
+        data = response.json()
+        self.assertEqual(
+            [item["client_id"] for item in data],
+            [
+                self.client_data["client_id"],
+                client_data["client_id"],
+                unknown_id,
+            ],
+        )
+        self.assertEqual(data[0]["ad"]["ad_title"], "Test Ad 2")
+        self.assertEqual(data[1]["ad"]["ad_title"], "Test Ad 2")
+        self.assertNotIn("ad", data[2])
+        self.assertEqual(
+            Impression.objects.filter(campaign_id=self.campaign_id2).count(),
+            2,
+        )
+
+    def test_get_ads_batch_empty(self):
+        response = self.client.post(
+            f"{self.prefix}/batch",
+            data={"client_ids": []},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.BAD_REQUEST)
+
+    def test_get_ads_batch_too_many_clients(self):
+        client_ids = [
+            str(uuid.uuid4())
+            for _ in range(settings.ADS_BATCH_MAX_CLIENTS + 1)
+        ]
+        response = self.client.post(
+            f"{self.prefix}/batch",
+            data={"client_ids": client_ids},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.BAD_REQUEST)
+
+    def test_get_ads_ranking_cache_invalidated_by_score(self):
+        response = self.client.post(
+            f"/advertisers/{self.ml_score_data2['advertiser_id']}/campaigns",
+            data={**self.campaign_data2, "ad_title": "Test Ad 3"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.CREATED)
+
+        client = Client.objects.get(id=self.client_data["client_id"])
+        candidates = ranking_cache.get(client)
+        self.assertIs(ranking_cache.get(client), candidates)
+
+        self.client.post(
+            "/ml-scores",
+            data={**self.ml_score_data2, "score": 0},
+            content_type="application/json",
+        )
+        self.assertIsNot(ranking_cache.get(client), candidates)
+
+        response = self.client.get(
+            f"{self.prefix}?client_id={self.client_data['client_id']}",
+            content_type="application/json",
+        )
+        self.assertEqual(response.json()["ad_title"], "Test Ad 2")
+
+
+def loop_best_campaign(campaigns, relevances, current_day):
+    """The per-campaign scoring loop the NumPy scorer replaced."""
+    filtered = [
+        campaign
+        for campaign in campaigns
+        if campaign.impressions_count <= campaign.impressions_limit * 1.03
+    ]
+    if not filtered:
+        return None
+
+    scores = [relevances[campaign.id] for campaign in filtered]
+    max_ml_score = max(scores) or 1
+    profits, limit_factors = [], []
+    for i, campaign in enumerate(filtered):
+        click_prob = scores[i] / max_ml_score
+        profits.append(
+            float(campaign.cost_per_impression)
+            + click_prob * float(campaign.cost_per_click)
+        )
+
+        progress = campaign.impressions_count / (
+            campaign.impressions_limit or 1
+        )
+        total_days = campaign.end_date - campaign.start_date + 1
+        days_left = (campaign.end_date - current_day + 1) / total_days
+        if progress < 0.95:
+            limit_factor = 1.0 + min(0.85, (0.95 - progress) * days_left)
+        elif progress <= 1.0:
+            limit_factor = 1.0
+        else:
+            limit_factor = max(0, 1.0 - (progress - 1.0) / 0.01 * 0.10)
+        limit_factors.append(limit_factor)
+
+    def normalize(values):
+        if len(filtered) < 10:
+            max_v = max(values) or 1
+            return [v / max_v for v in values]
+        min_v, max_v = min(values), max(values)
+        if min_v == max_v:
+            return [1.0] * len(values)
+        return [(v - min_v) / (max_v - min_v) for v in values]
+
+    profit_norms, relevance_norms = normalize(profits), normalize(scores)
+    best_campaign, best_score = None, float("-inf")
+    for i, campaign in enumerate(filtered):
+        score = (
+            0.5 * profit_norms[i]
+            + 0.25 * relevance_norms[i]
+            + 0.15 * limit_factors[i]
+        )
+        if score > best_score:
+            best_score, best_campaign = score, campaign
+    return best_campaign
+
+
+class ScoreParityTest(test.SimpleTestCase):
+    def make_campaigns(self, rng, count):
+        campaigns = []
+        for _ in range(count):
+            limit = rng.choice([0, 10, 100])
+            start_date = rng.randint(0, 5)
+            campaigns.append(
+                Campaign(
+                    id=uuid.uuid4(),
+                    advertiser_id=uuid.uuid4(),
+                    impressions_limit=limit,
+                    impressions_count=rng.choice([0, 5, 9, 10, 11, 100]),
+                    cost_per_impression=rng.choice([0.0, 1.0, 2.5]),
+                    cost_per_click=rng.choice([0.0, 1.0, 4.0]),
+                    start_date=start_date,
+                    end_date=start_date + rng.randint(5, 10),
+                )
+            )
+        return campaigns
+
+    def assert_same_winner(self, campaigns, relevances, current_day):
+        client = Client(id=uuid.uuid4())
+        ml_scores = {
+            (client.id, campaign.advertiser_id): relevances[campaign.id]
+            for campaign in campaigns
+        }
+        expected = loop_best_campaign(campaigns, relevances, current_day)
+        actual = select_best_campaign(
+            client, campaigns, current_day, ml_scores=ml_scores
+        )
+        self.assertIs(actual, expected)
+
+    def test_matches_loop_scorer(self):
+        rng = random.Random(42)
+        for count in [1, 2, 9, 10, 25]:
+            for _ in range(50):
+                campaigns = self.make_campaigns(rng, count)
+                relevances = {
+                    campaign.id: rng.choice([0, 0, 10, 50])
+                    for campaign in campaigns
+                }
+                with self.subTest(count=count):
+                    self.assert_same_winner(campaigns, relevances, 5)
+
+    def test_ties_pick_first_campaign(self):
+        rng = random.Random(7)
+        for count in [3, 12]:
+            twin = self.make_campaigns(rng, 1)[0]
+            twin.impressions_count = 0
+            campaigns = [
+                Campaign(
+                    **{
+                        field.attname: getattr(twin, field.attname)
+                        for field in Campaign._meta.concrete_fields
+                    }
+                )
+                for _ in range(count)
+            ]
+            for campaign in campaigns:
+                campaign.id = uuid.uuid4()
+            relevances = dict.fromkeys(
+                [campaign.id for campaign in campaigns], 10
+            )
+            self.assert_same_winner(campaigns, relevances, 5)
+            self.assertIs(
+                select_best_campaign(
+                    Client(id=uuid.uuid4()),
+                    campaigns,
+                    5,
+                    ml_scores={},
+                ),
+                campaigns[0],
+            )
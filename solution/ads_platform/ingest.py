@@ -0,0 +1,222 @@
+import abc
+import codecs
+import csv
+import io
+import json
+from bisect import insort
+from collections.abc import Callable, Iterable, Iterator
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import connection, transaction
+from ninja import Schema
+from pydantic import ValidationError
+
+NDJSON_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/x-ndjson": {"schema": {"type": "string"}},
+        },
+    },
+}
+
+JSON_ARRAY_READ_SIZE = 64 * 1024
+
+
+class _JsonArrayReader:
+    def __init__(self, stream: io.RawIOBase) -> None:
+        self.stream = stream
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buffer, self.position, self.eof = "", 0, False
+
+    def _read(self) -> None:
+        chunk = self.stream.read(JSON_ARRAY_READ_SIZE)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.position :] + self.utf8.decode(
+            chunk, final=self.eof
+        )
+        self.position = 0
+
+    def _error(self, msg: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(msg, self.buffer, self.position)
+
+    def _peek(self) -> str:
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position].isspace()
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if self.eof:
+                msg = "Unterminated JSON array"
+                raise self._error(msg)
+            self._read()
+
+    def _decode(self) -> object:
+        while True:
+            try:
+                element, end = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # A number at the end of the buffer may continue in the
+                # next chunk.
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return element
+            self._read()
+
+    def __iter__(self) -> Iterator[object]:
+        if self._peek() != "[":
+            msg = "Expecting '['"
+            raise self._error(msg)
+        self.position += 1
+        if self._peek() == "]":
+            return
+
+        while True:
+            self._peek()
+            yield self._decode()
+            char = self._peek()
+            if char == "]":
+                return
+            if char != ",":
+                msg = "Expecting ',' delimiter"
+                raise self._error(msg)
+            self.position += 1
+
+
+def iter_json_array(stream: io.RawIOBase) -> Iterator[object]:
+    """
+    Yields the elements of a JSON array read from stream in chunks of
+    JSON_ARRAY_READ_SIZE bytes, so only the elements being decoded are
+    held in memory. Raises json.JSONDecodeError on malformed input.
+    """
+    return iter(_JsonArrayReader(stream))
+
+
+class RejectedLine(Schema):
+    line: int
+    message: str
+
+
+class IngestSummary(Schema):
+    received: int = 0
+    upserted: int = 0
+    rejected: int = 0
+    errors: list[RejectedLine] = []
+
+
+class BulkIngest(abc.ABC):
+    """
+    Upserts NDJSON lines or parsed objects through a temporary COPY
+    staging table.
+
+    Lines are validated against schema, converted with to_row and copied
+    into the staging table in chunks of INGEST_CHUNK_SIZE. Each chunk is
+    merged into the target table with merge_sql and committed on its own,
+    so only the current chunk is held in memory. The summary keeps the
+    INGEST_MAX_ERRORS lowest-numbered rejected lines in line order, whether
+    they were rejected while parsing or by merge.
+    """
+
+    schema: type[Schema]
+    staging_table: str
+    columns: dict[str, str]
+    merge_sql: str
+
+    def __init__(
+        self, on_reject: Callable[[int, str], None] | None = None
+    ) -> None:
+        self.on_reject = on_reject
+        self.summary = IngestSummary()
+
+    @abc.abstractmethod
+    def to_row(self, obj: Schema) -> tuple:
+        pass
+
+    def reject(self, line: int, message: str) -> None:
+        if self.on_reject is not None:
+            self.on_reject(line, message)
+
+        self.summary.rejected += 1
+        insort(
+            self.summary.errors,
+            RejectedLine(line=line, message=message),
+            key=attrgetter("line"),
+        )
+        del self.summary.errors[settings.INGEST_MAX_ERRORS :]
+
+    def merge(self, cursor: object) -> None:
+        cursor.execute(self.merge_sql)
+        self.summary.upserted += cursor.rowcount
+
+    def _flush(self, cursor: object, rows: list[tuple]) -> None:
+        buffer = io.StringIO()
+        csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(rows)
+        buffer.seek(0)
+
+        with transaction.atomic():
+            cursor.copy_expert(
+                f"COPY {self.staging_table} (line, {', '.join(self.columns)})"
+                " FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+            self.merge(cursor)
+            cursor.execute(f"TRUNCATE {self.staging_table}")
+
+    def run(self, lines: Iterable[str | bytes]) -> IngestSummary:
+        items = (
+            (number, line)
+            for number, line in enumerate(lines, start=1)
+            if line.strip()
+        )
+        return self._load(items, self.schema.model_validate_json)
+
+    def run_objects(self, objects: Iterable[object]) -> IngestSummary:
+        items = enumerate(objects, start=1)
+        return self._load(items, self.schema.model_validate)
+
+    def _load(
+        self,
+        items: Iterable[tuple[int, object]],
+        validate: Callable[[object], Schema],
+    ) -> IngestSummary:
+        columns = ", ".join(
+            f"{name} {type_} NOT NULL" for name, type_ in self.columns.items()
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {self.staging_table}"
+                f" (line bigint NOT NULL, {columns})"
+            )
+
+            try:
+                rows = []
+                for number, item in items:
+                    self.summary.received += 1
+                    try:
+                        obj = validate(item)
+                    except ValidationError as error:
+                        self.reject(number, str(error))
+                        continue
+
+                    rows.append((number, *self.to_row(obj)))
+                    if len(rows) >= settings.INGEST_CHUNK_SIZE:
+                        self._flush(cursor, rows)
+                        rows = []
+
+                if rows:
+                    self._flush(cursor, rows)
+            finally:
+                cursor.execute(f"DROP TABLE {self.staging_table}")
+
+        return self.summary
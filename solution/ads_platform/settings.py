@@ -26,6 +26,34 @@ REDIS_PORT = env("REDIS_PORT", default="6379")
 
 POSTGRES_CONN = env("POSTGRES_CONN")
 
+IMPRESSIONS_BUFFER_SIZE = env("IMPRESSIONS_BUFFER_SIZE", int, default=1)
+IMPRESSIONS_BUFFER_MAX_DELAY = env(
+    "IMPRESSIONS_BUFFER_MAX_DELAY",
+    float,
+    default=1.0,
+)
+
+RANKING_CACHE_SIZE = env("RANKING_CACHE_SIZE", int, default=10000)
+ADS_BATCH_MAX_CLIENTS = env("ADS_BATCH_MAX_CLIENTS", int, default=100)
+CLIENT_CACHE_SIZE = env("CLIENT_CACHE_SIZE", int, default=100000)
+CLIENT_CACHE_LOCAL_TIMEOUT = env(
+    "CLIENT_CACHE_LOCAL_TIMEOUT",
+    float,
+    default=5.0,
+)
+CLIENT_CACHE_TIMEOUT = env("CLIENT_CACHE_TIMEOUT", int, default=3600)
+
+PARTITION_DAYS = env("PARTITION_DAYS", int, default=30)
+COMPACTION_DELAY_DAYS = env("COMPACTION_DELAY_DAYS", int, default=1)
+INGEST_CHUNK_SIZE = env("INGEST_CHUNK_SIZE", int, default=5000)
+INGEST_MAX_ERRORS = env("INGEST_MAX_ERRORS", int, default=100)
+
+STATS_CACHE_TIMEOUT = env("STATS_CACHE_TIMEOUT", int, default=300)
+METRICS_CACHE_TIMEOUT = env("METRICS_CACHE_TIMEOUT", int, default=15)
+METRICS_TOP_CAMPAIGNS = env("METRICS_TOP_CAMPAIGNS", int, default=100)
+METRICS_TOP_ADVERTISERS = env("METRICS_TOP_ADVERTISERS", int, default=100)
+METRICS_RETENTION_DAYS = env("METRICS_RETENTION_DAYS", int, default=7)
+
 YANDEX_GPT_MODEL_TYPE = env("YANDEX_GPT_MODEL_TYPE")
 YANDEX_GPT_CATALOG_ID = env("YANDEX_GPT_CATALOG_ID")
 YANDEX_GPT_API_KEY = env("YANDEX_GPT_API_KEY")
@@ -2,9 +2,11 @@ from django.contrib import admin
 from django.urls import include, path
 
 from ads_platform.api import api
+from stats.views import export_metrics
 
 urlpatterns = [
     path("", api.urls),
     path("admin/", admin.site.urls),
+    path("metrics/metrics", export_metrics, name="prometheus-metrics"),
     path("metrics/", include("django_prometheus.urls")),
 ]
@@ -8,8 +8,11 @@ from ninja import File, Query, Router
 from ninja import errors as ninja_errors
 from ninja.files import UploadedFile
 
+from ads.index import campaign_index
 from ads_platform import error_schemas
+from ads_platform.ingest import NDJSON_REQUEST_BODY, IngestSummary
 from advertisers import models, schemas
+from advertisers.ingest import AdvertiserIngest
 from ai_tools.cache import get_moderation_mode
 from ai_tools.utils import generation_ad_text, moderation_ad_text
 
@@ -55,6 +58,21 @@ def create_or_update_advertiser(
     )
 
 
+@router.post(
+    "/bulk.ndjson",
+    response={status.OK: IngestSummary},
+    openapi_extra=NDJSON_REQUEST_BODY,
+    tags=["Advertisers"],
+    description=(
+        "Потоковое создание и обновление рекламодателей из NDJSON, "
+        "по одному объекту в строке. Возвращает число загруженных "
+        "и отклоненных строк"
+    ),
+)
+def ingest_advertisers(request: HttpRequest):
+    return AdvertiserIngest().run(request)
+
+
 @router.get(
     "/{advertiser_id}",
     response={
@@ -106,6 +124,7 @@ def create_campaign(
     )
     campaign.full_clean()
     campaign.save()
+    campaign_index.update(campaign)
 
     return status.CREATED, campaign
 
@@ -211,7 +230,8 @@ def update_campaign(
 
         setattr(campaign, attr, value)
     campaign.full_clean()
-    campaign.save()
+    campaign.save(update_fields=campaign.get_update_fields())
+    campaign_index.update(campaign)
 
     return campaign
 
@@ -237,7 +257,7 @@ def upload_campaign_image(
     )
 
     campaign.image = image
-    campaign.save()
+    campaign.save(update_fields=["image"])
 
     return status.CREATED, campaign
 
@@ -261,5 +281,6 @@ def delete_campaign(
         models.Campaign, id=campaign_id, advertiser=advertiser
     )
     campaign.delete()
+    campaign_index.remove(campaign_id)
 
     return status.NO_CONTENT, {"status": "success"}
@@ -0,0 +1,43 @@
+import uuid
+
+from django.core.cache import cache
+
+from advertisers.models import Campaign
+
+
+def get_campaigns_version() -> int:
+    return cache.get("campaigns_version", default=0)
+
+
+def bump_campaigns_version() -> int:
+    cache.add("campaigns_version", 0, timeout=None)
+    return cache.incr("campaigns_version")
+
+
+def _impressions_count_key(campaign_id: uuid.UUID) -> str:
+    return f"campaign_impressions_count:{campaign_id}"
+
+
+def load_impressions_counts(campaigns: list[Campaign]):
+    keys = {
+        _impressions_count_key(campaign.id): campaign for campaign in campaigns
+    }
+    counts = cache.get_many(keys)
+
+    for key, campaign in keys.items():
+        if key in counts:
+            campaign.impressions_count = counts[key]
+        elif not cache.add(key, campaign.impressions_count, timeout=None):
+            campaign.impressions_count = cache.get(
+                key, default=campaign.impressions_count
+            )
+
+
+def incr_impressions_count(campaign: Campaign):
+    key = _impressions_count_key(campaign.id)
+
+    try:
+        campaign.impressions_count = cache.incr(key)
+    except ValueError:
+        campaign.impressions_count += 1
+        cache.add(key, campaign.impressions_count, timeout=None)
@@ -0,0 +1,61 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger("django")
+
+ARCHIVE_TABLES = {
+    "advertisers_impression": "advertisers_impressionarchive",
+    "advertisers_click": "advertisers_clickarchive",
+}
+
+ARCHIVE_SQL = """
+    WITH archived AS (
+        DELETE FROM {table}
+        WHERE campaign_id IN (
+            SELECT id FROM advertisers_campaign WHERE end_date < %s
+        )
+        RETURNING id, date, campaign_id, client_id, advertiser_id, cost
+    )
+    INSERT INTO {archive} (
+        id, date, campaign_id, client_id, advertiser_id, cost
+    )
+    SELECT * FROM archived
+"""
+
+
+def compact_finished_campaigns(current_date: int) -> dict[str, int]:
+    """
+    Moves the raw events of campaigns that ended more than
+    COMPACTION_DELAY_DAYS days before current_date to the archive tables.
+    Their stats stay in CampaignDailyStat, which is kept up to date as the
+    events are recorded.
+    """
+    end_date = current_date - settings.COMPACTION_DELAY_DAYS
+    archived = {}
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table, archive in ARCHIVE_TABLES.items():
+            cursor.execute(
+                ARCHIVE_SQL.format(table=table, archive=archive), [end_date]
+            )
+            archived[table] = cursor.rowcount
+
+    return archived
+
+
+def _compact_in_background(current_date: int) -> None:
+    try:
+        compact_finished_campaigns(current_date)
+    except Exception:
+        logger.exception("Failed to compact finished campaigns")
+    finally:
+        connection.close()
+
+
+def start_compaction(current_date: int) -> None:
+    threading.Thread(
+        target=_compact_in_background, args=(current_date,), daemon=True
+    ).start()
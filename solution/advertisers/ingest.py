@@ -0,0 +1,18 @@
+from ads_platform.ingest import BulkIngest
+from advertisers.schemas import AdvertiserRow
+
+
+class AdvertiserIngest(BulkIngest):
+    schema = AdvertiserRow
+    staging_table = "advertisers_advertiser_staging"
+    columns = {"id": "uuid", "name": "varchar"}
+    merge_sql = """
+        INSERT INTO advertisers_advertiser (id, name)
+        SELECT DISTINCT ON (id) id, name
+        FROM advertisers_advertiser_staging
+        ORDER BY id, line DESC
+        ON CONFLICT (id) DO UPDATE SET name = EXCLUDED.name
+    """
+
+    def to_row(self, obj: AdvertiserRow) -> tuple:
+        return obj.advertiser_id, obj.name
@@ -0,0 +1,214 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+
+from advertisers.models import Click, Impression
+from score.models import MLScore
+
+SEED_SQL = [
+    """
+    INSERT INTO clients_client (id, login, age, location, gender)
+    SELECT
+        md5('client:' || i)::uuid,
+        'bench_client_' || i,
+        i %% 100,
+        'city_' || i %% 50,
+        CASE WHEN i %% 2 = 0 THEN 'MALE' ELSE 'FEMALE' END
+    FROM generate_series(1, %(clients)s) AS i
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO advertisers_advertiser (id, name)
+    SELECT md5('advertiser:' || i)::uuid, 'bench_advertiser_' || i
+    FROM generate_series(1, %(advertisers)s) AS i
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO advertisers_campaign (
+        id, impressions_limit, impressions_count, clicks_limit,
+        clicks_count, cost_per_impression, cost_per_click, ad_title,
+        ad_text, start_date, end_date, is_active, advertiser_id
+    )
+    SELECT
+        md5('campaign:' || i)::uuid, 100000, 0, 10000, 0, 0.5, 2.0,
+        'bench_campaign_' || i, 'bench', 0, 30, TRUE,
+        md5('advertiser:' || (i %% %(advertisers)s + 1))::uuid
+    FROM generate_series(1, %(campaigns)s) AS i
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO advertisers_impression (
+        client_id, campaign_id, advertiser_id, date, cost
+    )
+    SELECT
+        md5('client:' || (i %% %(clients)s + 1))::uuid,
+        md5('campaign:' || (i::bigint * 7919 %% %(campaigns)s + 1))::uuid,
+        md5(
+            'advertiser:'
+            || ((i::bigint * 7919 %% %(campaigns)s + 1)
+                %% %(advertisers)s + 1)
+        )::uuid,
+        i %% 30,
+        0.5
+    FROM generate_series(1, %(impressions)s) AS i
+    """,
+    """
+    INSERT INTO advertisers_click (
+        client_id, campaign_id, advertiser_id, date, cost
+    )
+    SELECT
+        md5('client:' || (i %% %(clients)s + 1))::uuid,
+        md5('campaign:' || (i::bigint * 7919 %% %(campaigns)s + 1))::uuid,
+        md5(
+            'advertiser:'
+            || ((i::bigint * 7919 %% %(campaigns)s + 1)
+                %% %(advertisers)s + 1)
+        )::uuid,
+        i %% 30,
+        2.0
+    FROM generate_series(1, %(clicks)s) AS i
+    """,
+    """
+    INSERT INTO score_mlscore (client_id, advertiser_id, score)
+    SELECT
+        md5('client:' || i)::uuid,
+        md5('advertiser:' || ((i + j) %% %(advertisers)s + 1))::uuid,
+        (i * j) %% 100
+    FROM generate_series(1, %(clients)s) AS i,
+        generate_series(0, 4) AS j
+    ON CONFLICT DO NOTHING
+    """,
+    (
+        "ANALYZE clients_client, advertisers_advertiser, advertisers_campaign,"
+        " advertisers_impression, advertisers_click, score_mlscore"
+    ),
+]
+
+BASELINE_SCHEMA_SQL = [
+    "DROP INDEX impression_client_campaign_idx",
+    "DROP INDEX impression_campaign_date_idx",
+    "DROP INDEX click_client_campaign_idx",
+    "DROP INDEX click_campaign_date_idx",
+    (
+        "ALTER TABLE score_mlscore"
+        " DROP CONSTRAINT unique_client_advertiser_score"
+    ),
+    "CREATE INDEX ON advertisers_impression (client_id)",
+    "CREATE INDEX ON advertisers_impression (campaign_id)",
+    "CREATE INDEX ON advertisers_click (client_id)",
+    "CREATE INDEX ON advertisers_click (campaign_id)",
+    "CREATE INDEX ON score_mlscore (client_id)",
+    "ANALYZE advertisers_impression, advertisers_click, score_mlscore",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Records EXPLAIN plans and latency of the hot Impression, Click and "
+        "MLScore lookups with the single-column FK indexes (before) and the "
+        "composite indexes (after). The baseline schema is created inside a "
+        "rolled back transaction that locks the tables, so run it against a "
+        "dedicated benchmark database."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--seed",
+            action="store_true",
+            help="Seed the database with a synthetic dataset first.",
+        )
+        parser.add_argument("--clients", type=int, default=100_000)
+        parser.add_argument("--advertisers", type=int, default=1_000)
+        parser.add_argument("--campaigns", type=int, default=10_000)
+        parser.add_argument("--impressions", type=int, default=5_000_000)
+        parser.add_argument("--clicks", type=int, default=500_000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args: str, **options: int) -> None:
+        if options["seed"]:
+            self.stdout.write("Seeding dataset...")
+            with transaction.atomic(), connection.cursor() as cursor:
+                for sql in SEED_SQL:
+                    cursor.execute(sql, options)
+
+        queries = self.get_queries()
+        if queries is None:
+            self.stderr.write("No impressions found, run with --seed")
+            return
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for sql in BASELINE_SCHEMA_SQL:
+                    cursor.execute(sql)
+
+            self.report("before", queries, options["repeat"])
+            transaction.set_rollback(True)
+
+        self.report("after", queries, options["repeat"])
+
+    def get_queries(self) -> dict | None:
+        impression = Impression.objects.order_by("id").first()
+        if impression is None:
+            return None
+
+        campaign_ids = list(
+            Impression.objects.filter(client_id=impression.client_id)
+            .values_list("campaign_id", flat=True)
+            .distinct()[:50]
+        )
+        advertiser_ids = list(
+            MLScore.objects.filter(client_id=impression.client_id)
+            .values_list("advertiser_id", flat=True)
+            .distinct()
+        )
+
+        return {
+            "seen campaigns": Impression.objects.filter(
+                client_id=impression.client_id,
+                campaign_id__in=campaign_ids,
+            ).values_list("campaign_id", flat=True),
+            "click exists": Click.objects.filter(
+                client_id=impression.client_id,
+                campaign_id=impression.campaign_id,
+            ).values_list("id", flat=True)[:1],
+            "ml scores": MLScore.objects.filter(
+                client_id=impression.client_id,
+                advertiser_id__in=advertiser_ids,
+            ).values_list("advertiser_id", "score"),
+            "daily impressions": Impression.objects.filter(
+                campaign_id=impression.campaign_id,
+                date__gte=impression.date,
+            )
+            .values("date")
+            .order_by("date")
+            .annotate(count=Count("id"), spent=Sum("cost")),
+            "daily clicks": Click.objects.filter(
+                campaign_id=impression.campaign_id,
+                date__gte=impression.date,
+            )
+            .values("date")
+            .order_by("date")
+            .annotate(count=Count("id"), spent=Sum("cost")),
+        }
+
+    def report(self, stage: str, queries: dict, repeat: int) -> None:
+        self.stdout.write(self.style.MIGRATE_HEADING(f"=== {stage} ==="))
+
+        for name, queryset in queries.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{name}: median {statistics.median(timings):.3f} ms, "
+                    f"max {max(timings):.3f} ms"
+                )
+            )
+            self.stdout.write(queryset.explain(analyze=True, buffers=True))
+            self.stdout.write("")
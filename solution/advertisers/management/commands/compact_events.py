@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from advertisers.compaction import compact_finished_campaigns
+from time_emulation.cache import get_date
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves the raw impressions and clicks of finished campaigns to the "
+        "archive tables."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--date",
+            type=int,
+            help="Current date to compact against, defaults to /time date.",
+        )
+
+    def handle(self, *args: str, **options: int | None) -> None:
+        date = get_date() if options["date"] is None else options["date"]
+
+        for table, count in compact_finished_campaigns(date).items():
+            self.stdout.write(
+                self.style.SUCCESS(f"Archived {count} rows from {table}")
+            )
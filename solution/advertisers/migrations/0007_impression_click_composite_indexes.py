@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:28
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('advertisers', '0006_alter_campaign_cost_per_click_and_more'),
+        ('clients', '0002_alter_client_location_alter_client_login'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='click',
+            index=models.Index(fields=['client', 'campaign'], name='click_client_campaign_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='click',
+            index=models.Index(fields=['campaign', 'date'], name='click_campaign_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='impression',
+            index=models.Index(fields=['client', 'campaign'], name='impression_client_campaign_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='impression',
+            index=models.Index(fields=['campaign', 'date'], name='impression_campaign_date_idx'),
+        ),
+        migrations.AlterField(
+            model_name='click',
+            name='campaign',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='click_campaign', to='advertisers.campaign'),
+        ),
+        migrations.AlterField(
+            model_name='click',
+            name='client',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='click_client', to='clients.client'),
+        ),
+        migrations.AlterField(
+            model_name='impression',
+            name='campaign',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='impression_campaign', to='advertisers.campaign'),
+        ),
+        migrations.AlterField(
+            model_name='impression',
+            name='client',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='impression_client', to='clients.client'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:02
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('advertisers', '0007_impression_click_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='click',
+            name='advertiser',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='click_advertiser', to='advertisers.advertiser'),
+        ),
+        migrations.AddField(
+            model_name='impression',
+            name='advertiser',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='impression_advertiser', to='advertisers.advertiser'),
+        ),
+        migrations.RunSQL(
+            sql=[
+                'UPDATE advertisers_click SET advertiser_id = campaign.advertiser_id'
+                ' FROM advertisers_campaign AS campaign'
+                ' WHERE advertisers_click.campaign_id = campaign.id',
+                'UPDATE advertisers_impression SET advertiser_id = campaign.advertiser_id'
+                ' FROM advertisers_campaign AS campaign'
+                ' WHERE advertisers_impression.campaign_id = campaign.id',
+            ],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='click',
+            name='advertiser',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='click_advertiser', to='advertisers.advertiser'),
+        ),
+        migrations.AlterField(
+            model_name='impression',
+            name='advertiser',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='impression_advertiser', to='advertisers.advertiser'),
+        ),
+        AddIndexConcurrently(
+            model_name='click',
+            index=models.Index(fields=['advertiser', 'date'], name='click_advertiser_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='impression',
+            index=models.Index(fields=['advertiser', 'date'], name='impression_advertiser_date_idx'),
+        ),
+    ]
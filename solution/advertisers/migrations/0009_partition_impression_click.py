@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.db import migrations
+
+TABLES = {
+    'advertisers_impression': 'impression',
+    'advertisers_click': 'click',
+}
+
+PARTITION_SQL = """
+ALTER TABLE {table} RENAME TO {table}_old;
+ALTER INDEX {table}_pkey RENAME TO {table}_old_pkey;
+DROP INDEX {name}_client_campaign_idx;
+DROP INDEX {name}_campaign_date_idx;
+DROP INDEX {name}_advertiser_date_idx;
+
+CREATE SEQUENCE {table}_partitioned_id_seq;
+CREATE TABLE {table} (
+    id bigint NOT NULL DEFAULT nextval('{table}_partitioned_id_seq'),
+    date integer NOT NULL,
+    campaign_id uuid NOT NULL
+        REFERENCES advertisers_campaign (id) DEFERRABLE INITIALLY DEFERRED,
+    client_id uuid NOT NULL
+        REFERENCES clients_client (id) DEFERRABLE INITIALLY DEFERRED,
+    cost double precision NOT NULL,
+    advertiser_id uuid NOT NULL
+        REFERENCES advertisers_advertiser (id) DEFERRABLE INITIALLY DEFERRED,
+    CONSTRAINT {table}_pkey PRIMARY KEY (id, date)
+) PARTITION BY RANGE (date);
+CREATE TABLE {table}_default PARTITION OF {table} DEFAULT;
+
+CREATE INDEX {name}_client_campaign_idx ON {table} (client_id, campaign_id);
+CREATE INDEX {name}_campaign_date_idx ON {table} (campaign_id, date);
+CREATE INDEX {name}_advertiser_date_idx ON {table} (advertiser_id, date);
+"""
+
+COPY_SQL = """
+INSERT INTO {table} (id, date, campaign_id, client_id, cost, advertiser_id)
+SELECT id, date, campaign_id, client_id, cost, advertiser_id
+FROM {table}_old;
+
+SELECT setval(
+    '{table}_partitioned_id_seq',
+    (SELECT COALESCE(MAX(id), 0) + 1 FROM {table}_old),
+    false
+);
+DROP TABLE {table}_old;
+ALTER SEQUENCE {table}_partitioned_id_seq RENAME TO {table}_id_seq;
+ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id;
+"""
+
+
+CREATE_PARTITION_SQL = """
+CREATE TABLE {table}_{start} PARTITION OF {table}
+    FOR VALUES FROM ({start}) TO ({end})
+"""
+
+
+def create_existing_partitions(apps, schema_editor):
+    # Only the dates of the existing events are covered here; /time/advance
+    # creates the partitions for the current period.
+    days = settings.PARTITION_DAYS
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT MIN(date), MAX(date) FROM ('
+            ' SELECT date FROM advertisers_impression_old'
+            ' UNION ALL SELECT date FROM advertisers_click_old'
+            ') AS events'
+        )
+        date_from, date_to = cursor.fetchone()
+        if date_from is None:
+            return
+
+        for start in range(date_from - date_from % days, date_to + 1, days):
+            for table in TABLES:
+                cursor.execute(
+                    CREATE_PARTITION_SQL.format(
+                        table=table, start=start, end=start + days
+                    )
+                )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advertisers', '0008_impression_click_advertiser'),
+        ('clients', '0002_alter_client_location_alter_client_login'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            [
+                PARTITION_SQL.format(table=table, name=name)
+                for table, name in TABLES.items()
+            ]
+        ),
+        migrations.RunPython(create_existing_partitions),
+        migrations.RunSQL(
+            [COPY_SQL.format(table=table) for table in TABLES]
+        ),
+    ]
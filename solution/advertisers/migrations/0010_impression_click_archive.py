@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advertisers', '0009_partition_impression_click'),
+        ('clients', '0002_alter_client_location_alter_client_login'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClickArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date', models.IntegerField()),
+                ('cost', models.FloatField()),
+                ('advertiser', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='advertisers.advertiser')),
+                ('campaign', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='advertisers.campaign')),
+                ('client', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='clients.client')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['campaign', 'date'], name='click_archive_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ImpressionArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date', models.IntegerField()),
+                ('cost', models.FloatField()),
+                ('advertiser', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='advertisers.advertiser')),
+                ('campaign', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='advertisers.campaign')),
+                ('client', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='clients.client')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['campaign', 'date'], name='impression_archive_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advertisers', '0010_impression_click_archive'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='click',
+            name='click_advertiser_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='impression',
+            name='impression_advertiser_date_idx',
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advertisers', '0011_drop_impression_click_advertiser_date_idx'),
+        ('clients', '0002_alter_client_location_alter_client_login'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clickarchive',
+            index=models.Index(fields=['client', 'campaign'], name='click_archive_client_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='impressionarchive',
+            index=models.Index(fields=['client', 'campaign'], name='impression_archive_client_idx'),
+        ),
+    ]
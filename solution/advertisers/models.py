@@ -63,6 +63,8 @@ class Targeting(models.Model):
 
 
 class Campaign(models.Model):
+    COUNTER_FIELDS = ("impressions_count", "clicks_count")
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4)
 
     impressions_limit = models.IntegerField(
@@ -161,6 +163,15 @@ class Campaign(models.Model):
             "end_date",
         ]
 
+    def get_update_fields(self) -> list[str]:
+        # The counters are only changed with F() updates, saving the values
+        # loaded with the campaign would overwrite concurrent increments.
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key and field.name not in self.COUNTER_FIELDS
+        ]
+
     def clean(self):
         if self.end_date < self.start_date:
             raise ValidationError(message="end_date < start_date")
@@ -182,12 +193,21 @@ class Click(models.Model):
         "clients.Client",
         related_name="click_client",
         on_delete=models.CASCADE,
+        db_index=False,
     )
 
     campaign = models.ForeignKey(
         Campaign,
         related_name="click_campaign",
         on_delete=models.CASCADE,
+        db_index=False,
+    )
+
+    advertiser = models.ForeignKey(
+        Advertiser,
+        related_name="click_advertiser",
+        on_delete=models.CASCADE,
+        db_index=False,
     )
 
     date = models.IntegerField(default=0)
@@ -197,21 +217,47 @@ class Click(models.Model):
         ],
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["client", "campaign"],
+                name="click_client_campaign_idx",
+            ),
+            models.Index(
+                fields=["campaign", "date"],
+                name="click_campaign_date_idx",
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"{self.client.login} - {self.campaign.ad_title}"
 
+    def save(self, *args: object, **kwargs: object) -> None:
+        if self.advertiser_id is None:
+            self.advertiser_id = self.campaign.advertiser_id
+        super().save(*args, **kwargs)
+
 
 class Impression(models.Model):
     client = models.ForeignKey(
         "clients.Client",
         related_name="impression_client",
         on_delete=models.CASCADE,
+        db_index=False,
     )
 
     campaign = models.ForeignKey(
         Campaign,
         related_name="impression_campaign",
         on_delete=models.CASCADE,
+        db_index=False,
+    )
+
+    advertiser = models.ForeignKey(
+        Advertiser,
+        related_name="impression_advertiser",
+        on_delete=models.CASCADE,
+        db_index=False,
     )
 
     date = models.IntegerField(default=0)
@@ -221,5 +267,114 @@ class Impression(models.Model):
         ],
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["client", "campaign"],
+                name="impression_client_campaign_idx",
+            ),
+            models.Index(
+                fields=["campaign", "date"],
+                name="impression_campaign_date_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.client.login} - {self.campaign.ad_title}"
+
+    def save(self, *args: object, **kwargs: object) -> None:
+        if self.advertiser_id is None:
+            self.advertiser_id = self.campaign.advertiser_id
+        super().save(*args, **kwargs)
+
+
+class ImpressionArchive(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+
+    client = models.ForeignKey(
+        "clients.Client",
+        related_name="+",
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        db_index=False,
+    )
+
+    campaign = models.ForeignKey(
+        Campaign,
+        related_name="+",
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        db_index=False,
+    )
+
+    advertiser = models.ForeignKey(
+        Advertiser,
+        related_name="+",
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        db_index=False,
+    )
+
+    date = models.IntegerField()
+    cost = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["campaign", "date"],
+                name="impression_archive_idx",
+            ),
+            models.Index(
+                fields=["client", "campaign"],
+                name="impression_archive_client_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.client.login} - {self.campaign.ad_title}"
+
+
+class ClickArchive(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+
+    client = models.ForeignKey(
+        "clients.Client",
+        related_name="+",
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        db_index=False,
+    )
+
+    campaign = models.ForeignKey(
+        Campaign,
+        related_name="+",
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        db_index=False,
+    )
+
+    advertiser = models.ForeignKey(
+        Advertiser,
+        related_name="+",
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        db_index=False,
+    )
+
+    date = models.IntegerField()
+    cost = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["campaign", "date"],
+                name="click_archive_idx",
+            ),
+            models.Index(
+                fields=["client", "campaign"],
+                name="click_archive_client_idx",
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"{self.client.login} - {self.campaign.ad_title}"
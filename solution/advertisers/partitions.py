@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.db import connection, transaction
+
+PARTITIONED_TABLES = ("advertisers_impression", "advertisers_click")
+
+CREATE_PARTITION_SQL = [
+    "CREATE TABLE {partition} (LIKE {table} INCLUDING DEFAULTS)",
+    "LOCK TABLE {table}_default IN SHARE ROW EXCLUSIVE MODE",
+    """
+    WITH moved AS (
+        DELETE FROM {table}_default
+        WHERE date >= %(start)s AND date < %(end)s
+        RETURNING *
+    )
+    INSERT INTO {partition} SELECT * FROM moved
+    """,
+    (
+        "ALTER TABLE {table} ATTACH PARTITION {partition}"
+        " FOR VALUES FROM (%(start)s) TO (%(end)s)"
+    ),
+]
+
+
+def partition_start(date: int) -> int:
+    return date - date % settings.PARTITION_DAYS
+
+
+def create_partitions(date_from: int, date_to: int) -> None:
+    """
+    Creates the missing date partitions of the event tables covering
+    date_from..date_to. Rows that already landed in the default partition
+    for those dates are moved into the new partition while writers to the
+    default partition are locked out.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(hashtext('event_partitions'))"
+        )
+
+        for table in PARTITIONED_TABLES:
+            start = partition_start(date_from)
+            while start <= date_to:
+                params = {
+                    "start": start,
+                    "end": start + settings.PARTITION_DAYS,
+                }
+                partition = f"{table}_{start}"
+
+                cursor.execute("SELECT to_regclass(%s)", [partition])
+                if cursor.fetchone()[0] is None:
+                    for sql in CREATE_PARTITION_SQL:
+                        cursor.execute(
+                            sql.format(table=table, partition=partition),
+                            params,
+                        )
+
+                start = params["end"]
@@ -13,6 +13,10 @@ class AdvertiserIn(ModelSchema):
         fields = ["name"]
 
 
+class AdvertiserRow(AdvertiserIn):
+    name: str = Field(..., min_length=1)
+
+
 class AdvertiserOut(ModelSchema):
     advertiser_id: uuid.UUID = Field(..., alias="id")
 
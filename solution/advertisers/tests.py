@@ -1,8 +1,14 @@
 from http import HTTPStatus as status
 from django import test
-from advertisers.models import Advertiser
+from django.db import connection
+from django.db.models import F
+from advertisers.models import Advertiser, Campaign, Impression
+from advertisers.partitions import create_partitions, partition_start
+from clients.models import Client
 from time_emulation.cache import get_date
+import json
 import uuid
+from unittest import mock
 
 
 class AdvertisersTest(test.TestCase):
@@ -159,6 +165,39 @@ class AdvertisersTest(test.TestCase):
             ).name,
         )
 
+    def test_bulk_ndjson(self):
+        self.client.post(
+            f"{self.prefix}/bulk",
+            data=self.test_valid_advertisers[:1],
+            content_type="application/json",
+        )
+        renamed = {**self.test_valid_advertisers[0], "name": "renamed"}
+        lines = [
+            json.dumps(self.test_invalid_advertisers[0]),
+            json.dumps(renamed),
+            json.dumps(self.test_valid_advertisers[1]),
+            json.dumps({"name": "no id"}),
+        ]
+
+        response = self.client.post(
+            f"{self.prefix}/bulk.ndjson",
+            data="\n".join(lines),
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(response.status_code, status.OK)
+        summary = response.json()
+        self.assertEqual(summary["received"], 4)
+        self.assertEqual(summary["upserted"], 2)
+        self.assertEqual(summary["rejected"], 2)
+        self.assertEqual(
+            [error["line"] for error in summary["errors"]], [1, 4]
+        )
+        self.assertEqual(Advertiser.objects.count(), 2)
+        self.assertEqual(
+            Advertiser.objects.get(id=renamed["advertiser_id"]).name,
+            "renamed",
+        )
+
     def test_get_advertiser(self):
         self.client.post(
             f"{self.prefix}/bulk",
@@ -255,3 +294,54 @@ class AdvertisersTest(test.TestCase):
             content_type="application/json",
         )
         self.assertEqual(response.status_code, status.NOT_FOUND)
+
+    def test_update_campaign_keeps_concurrent_counters(self):
+        self.create_campaigns()
+        campaign = Campaign.objects.first()
+        url = (
+            f"{self.prefix}/{campaign.advertiser_id}/campaigns/{campaign.id}"
+        )
+
+        def served_meanwhile(campaign: Campaign, **kwargs: object) -> None:
+            Campaign.objects.filter(id=campaign.id).update(
+                impressions_count=F("impressions_count") + 1
+            )
+
+        with mock.patch.object(
+            Campaign, "full_clean", autospec=True, side_effect=served_meanwhile
+        ):
+            response = self.client.put(
+                url,
+                data={**self.valid_campaign, "ad_title": "Updated"},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, status.OK)
+
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.ad_title, "Updated")
+        self.assertEqual(campaign.impressions_count, 1)
+
+    def test_create_partitions_moves_default_rows(self):
+        self.create_campaigns()
+        campaign = Campaign.objects.first()
+        client = Client.objects.create(
+            login="partitioned", age=30, location="Moscow", gender="MALE"
+        )
+        date = get_date() + 1000
+        Impression.objects.create(
+            client=client, campaign=campaign, date=date, cost=1.0
+        )
+
+        create_partitions(date, date)
+
+        partition = f"advertisers_impression_{partition_start(date)}"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT tableoid::regclass::text FROM advertisers_impression"
+                " WHERE date = %s",
+                [date],
+            )
+            self.assertEqual(cursor.fetchall(), [(partition,)])
+        self.assertEqual(
+            Impression.objects.filter(campaign=campaign, date=date).count(), 1
+        )
@@ -1,33 +1,86 @@
+import json
 import uuid
 from http import HTTPStatus as status
 
+import pydantic
 from django.core.exceptions import ValidationError
 from django.http import HttpRequest
 from django.shortcuts import get_object_or_404
-from ninja import Router
+from ninja import Query, Router, errors
 
 from ads_platform import error_schemas
+from ads_platform.ingest import (
+    NDJSON_REQUEST_BODY,
+    IngestSummary,
+    iter_json_array,
+)
 from clients import models, schemas
+from clients.cache import client_cache
+from clients.ingest import ClientIngest
 
 router = Router(tags=["Clients"])
 
+client_list = pydantic.TypeAdapter(list[schemas.ClientIn])
+
+CLIENTS_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "array",
+                    "items": schemas.ClientIn.model_json_schema(),
+                },
+            },
+        },
+    },
+}
+
 
 @router.post(
     "/bulk",
     response={
         status.CREATED: list[schemas.ClientOut],
+        status.OK: IngestSummary,
         status.BAD_REQUEST: error_schemas.ValidationError,
         status.NOT_FOUND: error_schemas.NotFoundError,
     },
     exclude_none=True,
+    openapi_extra=CLIENTS_REQUEST_BODY,
     description=(
         "Создание и обновление клиентов. "
-        "Создаются только валидные сущности"
+        "Создаются только валидные сущности. "
+        "В режиме mode=copy тело читается потоково, каждый клиент "
+        "проверяется только схемой, загружается через COPY и "
+        "возвращается число загруженных и отклоненных клиентов"
     ),
 )
 def create_or_update_clients(
-    request: HttpRequest, payload: list[schemas.ClientIn]
+    request: HttpRequest,
+    options: schemas.ClientBulkOptions = Query(...),  # noqa: B008
 ):
+    # The body is not a ninja parameter, so that copy mode can stream it.
+    if options.mode == "copy":
+        try:
+            summary = ClientIngest().run_objects(iter_json_array(request))
+        except json.JSONDecodeError as error:
+            raise errors.ValidationError(errors=[str(error)]) from error
+        return status.OK, summary
+
+    try:
+        payload = client_list.validate_json(request.body)
+    except pydantic.ValidationError as error:
+        raise errors.ValidationError(
+            errors=[
+                {**detail, "loc": ("body", "payload", *detail["loc"])}
+                for detail in error.errors(
+                    include_url=False,
+                    include_context=False,
+                    include_input=False,
+                )
+            ]
+        ) from error
+
     clients = []
 
     for client in payload:
@@ -41,12 +94,29 @@ def create_or_update_clients(
         except ValidationError:
             continue
 
-    return status.CREATED, models.Client.objects.bulk_create(
+    clients = models.Client.objects.bulk_create(
         clients,
         update_conflicts=True,
         unique_fields=["id"],
         update_fields=["login", "age", "location", "gender"],
     )
+    client_cache.invalidate(client.id for client in clients)
+
+    return status.CREATED, clients
+
+
+@router.post(
+    "/bulk.ndjson",
+    response={status.OK: IngestSummary},
+    openapi_extra=NDJSON_REQUEST_BODY,
+    description=(
+        "Потоковое создание и обновление клиентов из NDJSON, "
+        "по одному объекту в строке. Возвращает число загруженных "
+        "и отклоненных строк"
+    ),
+)
+def ingest_clients(request: HttpRequest):
+    return ClientIngest().run(request)
 
 
 @router.get(
@@ -0,0 +1,112 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+from clients.models import Client
+from stats import metrics
+
+PROFILE_FIELDS = ("id", "age", "location", "gender")
+
+
+def _version_key(client_id: uuid.UUID) -> str:
+    return f"client_profile_version:{client_id}"
+
+
+def _profile_key(client_id: uuid.UUID, version: str) -> str:
+    return f"client_profile:{client_id}:{version}"
+
+
+def _to_client(profile: tuple) -> Client:
+    # Only the serving fields are loaded, login stays deferred. from_db
+    # expects the values in the model's field order.
+    return Client.from_db(None, PROFILE_FIELDS, profile)
+
+
+class ClientProfileCache:
+    """
+    Two-tier read-through cache of the client fields used for serving.
+
+    A per-worker LRU with a short TTL sits in front of Redis. Redis
+    profiles are keyed by a per-client version that every update replaces,
+    so a reader that loaded the row before a concurrent update can only
+    store it under the outdated version. Unknown clients are never cached.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def _get_local(self, client_id: uuid.UUID) -> tuple | None:
+        with self._lock:
+            entry = self._entries.get(client_id)
+            if entry is None:
+                return None
+
+            expires_at, profile = entry
+            if expires_at < time.monotonic():
+                del self._entries[client_id]
+                return None
+
+            self._entries.move_to_end(client_id)
+            return profile
+
+    def _set_local(self, client_id: uuid.UUID, profile: tuple) -> None:
+        with self._lock:
+            self._entries[client_id] = (
+                time.monotonic() + settings.CLIENT_CACHE_LOCAL_TIMEOUT,
+                profile,
+            )
+            self._entries.move_to_end(client_id)
+            while len(self._entries) > settings.CLIENT_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def get(self, client_id: uuid.UUID) -> Client | None:
+        profile = self._get_local(client_id)
+        if profile is not None:
+            metrics.client_cache_lookups.labels(result="local").inc()
+            return _to_client(profile)
+
+        version = cache.get(_version_key(client_id), default="0")
+        profile = cache.get(_profile_key(client_id, version))
+        if profile is not None:
+            metrics.client_cache_lookups.labels(result="redis").inc()
+        else:
+            metrics.client_cache_lookups.labels(result="miss").inc()
+            profile = (
+                Client.objects.filter(id=client_id)
+                .values_list(*PROFILE_FIELDS)
+                .first()
+            )
+            if profile is None:
+                return None
+
+            cache.set(
+                _profile_key(client_id, version),
+                profile,
+                timeout=settings.CLIENT_CACHE_TIMEOUT,
+            )
+
+        self._set_local(client_id, profile)
+        return _to_client(profile)
+
+    def invalidate(self, client_ids: Iterable[uuid.UUID]) -> None:
+        client_ids = list(client_ids)
+
+        # The version outlives any profile stored under the previous one,
+        # so an expired version cannot resurrect an outdated profile.
+        version = uuid.uuid4().hex
+        cache.set_many(
+            {_version_key(client_id): version for client_id in client_ids},
+            timeout=settings.CLIENT_CACHE_TIMEOUT,
+        )
+        with self._lock:
+            for client_id in client_ids:
+                self._entries.pop(client_id, None)
+
+
+client_cache = ClientProfileCache()
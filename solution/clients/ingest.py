@@ -0,0 +1,45 @@
+from functools import partial
+
+from django.db import transaction
+
+from ads_platform.ingest import BulkIngest
+from clients.cache import client_cache
+from clients.schemas import ClientRow
+
+
+class ClientIngest(BulkIngest):
+    schema = ClientRow
+    staging_table = "clients_client_staging"
+    columns = {
+        "id": "uuid",
+        "login": "varchar",
+        "age": "integer",
+        "location": "varchar",
+        "gender": "varchar",
+    }
+    merge_sql = """
+        INSERT INTO clients_client (id, login, age, location, gender)
+        SELECT DISTINCT ON (id) id, login, age, location, gender
+        FROM clients_client_staging
+        ORDER BY id, line DESC
+        ON CONFLICT (id) DO UPDATE SET
+            login = EXCLUDED.login,
+            age = EXCLUDED.age,
+            location = EXCLUDED.location,
+            gender = EXCLUDED.gender
+        RETURNING id
+    """
+
+    def merge(self, cursor: object) -> None:
+        super().merge(cursor)
+        client_ids = [client_id for (client_id,) in cursor.fetchall()]
+        transaction.on_commit(partial(client_cache.invalidate, client_ids))
+
+    def to_row(self, obj: ClientRow) -> tuple:
+        return (
+            obj.client_id,
+            obj.login,
+            obj.age,
+            obj.location,
+            obj.gender.value,
+        )
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from clients.ingest import ClientIngest
+
+
+class Command(BaseCommand):
+    help = (
+        "Upserts clients from an NDJSON file (one ClientIn object per line) "
+        "through a COPY staging table. Rejected lines are reported as they "
+        "are read."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "path", help="NDJSON file to ingest, - reads from stdin."
+        )
+
+    def handle(self, *args: str, **options: str) -> None:
+        ingest = ClientIngest(
+            lambda line, error: self.stderr.write(f"line {line}: {error}")
+        )
+
+        if options["path"] == "-":
+            summary = ingest.run(sys.stdin)
+        else:
+            with Path(options["path"]).open(encoding="utf-8") as file:
+                summary = ingest.run(file)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Upserted {summary.upserted} clients, "
+                f"rejected {summary.rejected} lines"
+            )
+        )
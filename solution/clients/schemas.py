@@ -1,6 +1,7 @@
 import uuid
+from typing import Literal
 
-from ninja import Field, ModelSchema
+from ninja import Field, ModelSchema, Schema
 
 from clients.models import Client
 
@@ -18,6 +19,17 @@ class ClientIn(ModelSchema):
         ]
 
 
+class ClientRow(ClientIn):
+    login: str = Field(..., min_length=1)
+    age: int = Field(..., ge=0, le=100)
+    location: str = Field(..., min_length=1)
+    gender: Client.Gender
+
+
+class ClientBulkOptions(Schema):
+    mode: Literal["validate", "copy"] = "validate"
+
+
 class ClientOut(ModelSchema):
     client_id: uuid.UUID = Field(..., alias="id")
 
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from clients.cache import client_cache
+from clients.models import Client
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def invalidate_client_profile(instance: Client, **kwargs: object) -> None:
+    client_cache.invalidate([instance.id])
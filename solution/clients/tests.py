@@ -1,6 +1,10 @@
 from http import HTTPStatus as status
 from django import test
+from django.core.management import call_command
 from clients.models import Client
+from io import StringIO
+import json
+import tempfile
 import uuid
 
 
@@ -75,6 +79,41 @@ class ClientsTest(test.TestCase):
         self.assertEqual(len(response.json()), 2)
         self.assertEqual(Client.objects.count(), 2)
 
+    def test_bulk_copy_mode(self):
+        malformed = {**self.test_valid_clients[0], "client_id": "bad"}
+        mixed_clients = [
+            *self.test_valid_clients,
+            malformed,
+            *self.test_invalid_clients,
+        ]
+        response = self.client.post(
+            f"{self.prefix}/bulk?mode=copy",
+            data=mixed_clients,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.OK)
+        summary = response.json()
+        self.assertEqual(summary["received"], 5)
+        self.assertEqual(summary["upserted"], 2)
+        self.assertEqual(
+            [error["line"] for error in summary["errors"]], [3, 4, 5]
+        )
+        self.assertEqual(Client.objects.count(), 2)
+
+    def test_bulk_malformed_client_id(self):
+        malformed = {**self.test_valid_clients[0], "client_id": "bad"}
+        response = self.client.post(
+            f"{self.prefix}/bulk",
+            data=[self.test_valid_clients[1], malformed],
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.BAD_REQUEST)
+        self.assertEqual(
+            response.json()["message"][0]["loc"],
+            ["body", "payload", 1, "client_id"],
+        )
+        self.assertEqual(Client.objects.count(), 0)
+
     def test_bulk_update(self):
         self.client.post(
             f"{self.prefix}/bulk",
@@ -104,6 +143,58 @@ class ClientsTest(test.TestCase):
         self.assertEqual(updated.login, "updated_user1")
         self.assertEqual(updated.age, 26)
 
+    def test_bulk_ndjson(self):
+        self.client.post(
+            f"{self.prefix}/bulk",
+            data=self.test_valid_clients[:1],
+            content_type="application/json",
+        )
+        updated = {**self.test_valid_clients[0], "age": 40}
+        lines = [
+            json.dumps(self.test_valid_clients[0]),
+            json.dumps(self.test_invalid_clients[0]),
+            "",
+            json.dumps(self.test_valid_clients[1]),
+            "{not json",
+            json.dumps(updated),
+        ]
+
+        response = self.client.post(
+            f"{self.prefix}/bulk.ndjson",
+            data="\n".join(lines),
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(response.status_code, status.OK)
+        summary = response.json()
+        self.assertEqual(summary["received"], 5)
+        self.assertEqual(summary["upserted"], 2)
+        self.assertEqual(summary["rejected"], 2)
+        self.assertEqual(
+            [error["line"] for error in summary["errors"]], [2, 5]
+        )
+        self.assertEqual(Client.objects.count(), 2)
+        self.assertEqual(Client.objects.get(id=updated["client_id"]).age, 40)
+
+    def test_ingest_clients(self):
+        updated = {**self.test_valid_clients[0], "age": 40}
+        lines = [
+            *self.test_valid_clients,
+            {**self.test_invalid_clients[0], "client_id": str(uuid.uuid4())},
+            updated,
+        ]
+
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson") as file:
+            file.write("\n".join(json.dumps(line) for line in lines))
+            file.flush()
+            stderr = StringIO()
+            call_command(
+                "ingest_clients", file.name, stdout=StringIO(), stderr=stderr
+            )
+
+        self.assertIn("line 3:", stderr.getvalue())
+        self.assertEqual(Client.objects.count(), 2)
+        self.assertEqual(Client.objects.get(id=updated["client_id"]).age, 40)
+
     def test_get_client(self):
         self.client.post(
             f"{self.prefix}/bulk",
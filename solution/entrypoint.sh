@@ -2,4 +2,8 @@
 
 python manage.py migrate
 
-gunicorn ads_platform.wsgi:application -b :8080 --timeout 120 --workers 3
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+gunicorn ads_platform.wsgi:application -c gunicorn.conf.py -b :8080 --timeout 120 --workers 3
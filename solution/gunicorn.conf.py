@@ -0,0 +1,13 @@
+from gunicorn.arbiter import Arbiter
+from gunicorn.workers.base import Worker
+from prometheus_client import multiprocess
+
+
+def child_exit(server: Arbiter, worker: Worker) -> None:
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server: Arbiter, worker: Worker) -> None:
+    from ads.buffer import impression_buffer  # noqa: PLC0415
+
+    impression_buffer.flush()
@@ -1,13 +1,17 @@
 from http import HTTPStatus as status
 
+from django.conf import settings
 from django.http import HttpRequest
 from django.shortcuts import get_object_or_404
 from ninja import Router
 
 from ads_platform import error_schemas
+from ads_platform.ingest import NDJSON_REQUEST_BODY, IngestSummary
 from advertisers import models as advertisers_models
 from clients import models as client_models
 from score import models, schemas
+from score.cache import bump_scores_versions
+from score.ingest import MLScoreIngest
 
 router = Router(tags=["Advertisers"])
 
@@ -41,4 +45,73 @@ def create_or_update_score(request: HttpRequest, payload: schemas.MLScoreIn):
         )
     obj.full_clean()
     obj.save()
+    bump_scores_versions([payload.client_id])
     return obj
+
+
+@router.post(
+    "/bulk",
+    response={
+        status.CREATED: list[schemas.MLScoreOut],
+        status.BAD_REQUEST: error_schemas.ValidationError,
+    },
+    exclude_none=True,
+    description=(
+        "Создание и обновление ML-скоров. Сохраняются только скоры "
+        "с неотрицательным значением для существующих клиентов "
+        "и рекламодателей"
+    ),
+)
+def create_or_update_scores(
+    request: HttpRequest, payload: list[schemas.MLScoreIn]
+):
+    client_ids = set(
+        client_models.Client.objects.filter(
+            id__in={score.client_id for score in payload}
+        ).values_list("id", flat=True)
+    )
+    advertiser_ids = set(
+        advertisers_models.Advertiser.objects.filter(
+            id__in={score.advertiser_id for score in payload}
+        ).values_list("id", flat=True)
+    )
+
+    scores = {}
+    for score in payload:
+        if (
+            score.score >= 0
+            and score.client_id in client_ids
+            and score.advertiser_id in advertiser_ids
+        ):
+            scores[score.client_id, score.advertiser_id] = models.MLScore(
+                client=client_models.Client(id=score.client_id),
+                advertiser=advertisers_models.Advertiser(
+                    id=score.advertiser_id
+                ),
+                score=score.score,
+            )
+
+    scores = models.MLScore.objects.bulk_create(
+        scores.values(),
+        update_conflicts=True,
+        unique_fields=["client", "advertiser"],
+        update_fields=["score"],
+        batch_size=settings.INGEST_CHUNK_SIZE,
+    )
+    bump_scores_versions({score.client_id for score in scores})
+
+    return status.CREATED, scores
+
+
+@router.post(
+    "/bulk.ndjson",
+    response={status.OK: IngestSummary},
+    openapi_extra=NDJSON_REQUEST_BODY,
+    description=(
+        "Потоковое создание и обновление ML-скоров из NDJSON, "
+        "по одному объекту в строке. Возвращает число загруженных "
+        "и отклоненных строк"
+    ),
+)
+def ingest_scores(request: HttpRequest):
+    return MLScoreIngest().run(request)
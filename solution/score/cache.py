@@ -0,0 +1,22 @@
+import uuid
+from collections.abc import Iterable
+
+from django.core.cache import cache
+
+
+def _scores_version_key(client_id: uuid.UUID) -> str:
+    return f"ml_scores_version:{client_id}"
+
+
+def get_scores_version(client_id: uuid.UUID) -> str:
+    return cache.get(_scores_version_key(client_id), default="0")
+
+
+def bump_scores_versions(client_ids: Iterable[uuid.UUID]) -> None:
+    # One fresh token for the whole batch is a single round trip, unlike
+    # an add/incr pair per client.
+    version = uuid.uuid4().hex
+    cache.set_many(
+        {_scores_version_key(client_id): version for client_id in client_ids},
+        timeout=None,
+    )
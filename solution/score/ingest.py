@@ -0,0 +1,56 @@
+from functools import partial
+
+from django.db import transaction
+
+from ads_platform.ingest import BulkIngest
+from score.cache import bump_scores_versions
+from score.schemas import MLScoreRow
+
+UNKNOWN_SQL = """
+    SELECT line FROM score_mlscore_staging AS staging
+    WHERE NOT EXISTS (
+        SELECT 1 FROM clients_client WHERE id = staging.client_id
+    ) OR NOT EXISTS (
+        SELECT 1 FROM advertisers_advertiser
+        WHERE id = staging.advertiser_id
+    )
+    ORDER BY line
+"""
+
+
+class MLScoreIngest(BulkIngest):
+    schema = MLScoreRow
+    staging_table = "score_mlscore_staging"
+    columns = {
+        "client_id": "uuid",
+        "advertiser_id": "uuid",
+        "score": "integer",
+    }
+    merge_sql = """
+        INSERT INTO score_mlscore (client_id, advertiser_id, score)
+        SELECT DISTINCT ON (client_id, advertiser_id)
+            client_id, advertiser_id, score
+        FROM score_mlscore_staging AS staging
+        WHERE EXISTS (
+            SELECT 1 FROM clients_client WHERE id = staging.client_id
+        ) AND EXISTS (
+            SELECT 1 FROM advertisers_advertiser
+            WHERE id = staging.advertiser_id
+        )
+        ORDER BY client_id, advertiser_id, line DESC
+        ON CONFLICT (client_id, advertiser_id) DO UPDATE SET
+            score = EXCLUDED.score
+        RETURNING client_id
+    """
+
+    def to_row(self, obj: MLScoreRow) -> tuple:
+        return obj.client_id, obj.advertiser_id, obj.score
+
+    def merge(self, cursor: object) -> None:
+        cursor.execute(UNKNOWN_SQL)
+        for (line,) in cursor.fetchall():
+            self.reject(line, "Unknown client_id or advertiser_id")
+
+        super().merge(cursor)
+        client_ids = {client_id for (client_id,) in cursor.fetchall()}
+        transaction.on_commit(partial(bump_scores_versions, client_ids))
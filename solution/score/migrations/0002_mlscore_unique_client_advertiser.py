@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advertisers', '0007_impression_click_composite_indexes'),
+        ('clients', '0002_alter_client_location_alter_client_login'),
+        ('score', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                DELETE FROM score_mlscore AS old
+                USING score_mlscore AS new
+                WHERE old.client_id = new.client_id
+                  AND old.advertiser_id = new.advertiser_id
+                  AND old.id < new.id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='mlscore',
+            constraint=models.UniqueConstraint(fields=('client', 'advertiser'), name='unique_client_advertiser_score'),
+        ),
+        migrations.AlterField(
+            model_name='mlscore',
+            name='client',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='clients.client'),
+        ),
+    ]
@@ -6,6 +6,7 @@ class MLScore(models.Model):
     client = models.ForeignKey(
         "clients.Client",
         on_delete=models.CASCADE,
+        db_index=False,
     )
     advertiser = models.ForeignKey(
         "advertisers.Advertiser",
@@ -16,5 +17,13 @@ class MLScore(models.Model):
         default=0, validators=[validators.MinValueValidator(0)]
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["client", "advertiser"],
+                name="unique_client_advertiser_score",
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"{self.client.login}/{self.advertiser.name}/{self.score}"
@@ -14,6 +14,10 @@ class MLScoreIn(ModelSchema):
         fields = ["score"]
 
 
+class MLScoreRow(MLScoreIn):
+    score: int = Field(0, ge=0)
+
+
 class MLScoreOut(ModelSchema):
     advertiser_id: uuid.UUID = Field(..., alias="advertiser.id")
     client_id: uuid.UUID = Field(..., alias="client.id")
@@ -3,6 +3,7 @@ from django import test
 from score.models import MLScore
 from clients.models import Client
 from advertisers.models import Advertiser
+import json
 import uuid
 
 
@@ -66,6 +67,66 @@ class MLScoreTest(test.TestCase):
         )
         self.assertEqual(ml_score.score, 80)
 
+    def test_bulk_create_scores(self):
+        scores = [
+            self.valid_ml_score,
+            {**self.valid_ml_score, "client_id": str(uuid.uuid4())},
+            self.invalid_score_value,
+            {**self.valid_ml_score, "score": 90},
+        ]
+
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                f"{self.prefix}/bulk",
+                data=scores,
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, status.CREATED)
+        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(response.json()[0]["score"], 90)
+        self.assertEqual(MLScore.objects.get().score, 90)
+
+    def test_ingest_scores_ndjson(self):
+        unknown_client = {
+            **self.valid_ml_score,
+            "client_id": str(uuid.uuid4()),
+        }
+        lines = [
+            self.valid_ml_score,
+            self.invalid_ml_score,
+            unknown_client,
+            {**self.valid_ml_score, "score": 90},
+        ]
+
+        response = self.client.post(
+            f"{self.prefix}/bulk.ndjson",
+            data="\n".join(json.dumps(line) for line in lines),
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(response.json()["received"], 4)
+        self.assertEqual(response.json()["upserted"], 1)
+        self.assertEqual(
+            [error["line"] for error in response.json()["errors"]], [2, 3]
+        )
+        self.assertEqual(MLScore.objects.get().score, 90)
+
+    def test_bulk_ndjson_errors_in_line_order(self):
+        unknown_client = {
+            **self.valid_ml_score,
+            "client_id": str(uuid.uuid4()),
+        }
+        lines = [unknown_client, self.invalid_ml_score]
+
+        response = self.client.post(
+            f"{self.prefix}/bulk.ndjson",
+            data="\n".join(json.dumps(line) for line in lines),
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(
+            [error["line"] for error in response.json()["errors"]], [1, 2]
+        )
+
     def test_create_invalid_advertiser_id(self):
         response = self.client.post(
             self.prefix,
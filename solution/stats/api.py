@@ -1,19 +1,79 @@
 import uuid
-from collections import defaultdict
+from collections.abc import Iterator
 from http import HTTPStatus as status
 
-from django.db.models import Count, Sum
-from django.http import HttpRequest
+from django.db.models import QuerySet, Sum
+from django.http import HttpRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from ninja import Router
+from ninja import Query, Router
 
 from ads_platform import error_schemas
-from advertisers.models import Advertiser, Campaign, Click, Impression
-from stats import schemas
+from advertisers.models import Advertiser, Campaign
+from stats import export, schemas
+from stats.cache import get_or_set_stats
+from stats.models import CampaignDailyStat
+from stats.reach import get_daily_reach, get_reach
 
 router = Router(tags=["Statistics"])
 
 
+def _daily_sums(prefix: str = "") -> dict:
+    return {
+        field: Sum(f"{prefix}{field}", default=0)
+        for field in (
+            "impressions_count",
+            "clicks_count",
+            "spent_impressions",
+            "spent_clicks",
+        )
+    }
+
+
+def _filter_days(
+    stats: QuerySet,
+    filters: schemas.DailyStatFilters,
+    kind: str,
+    entity_id: uuid.UUID,
+) -> list[schemas.CampaignStatDaily]:
+    if filters.from_date is not None:
+        stats = stats.filter(date__gte=filters.from_date)
+    if filters.to_date is not None:
+        stats = stats.filter(date__lte=filters.to_date)
+
+    stats = [
+        schemas.CampaignStatDaily.from_orm(stat)
+        for stat in stats.order_by("date")[: filters.limit]
+    ]
+    reach = get_daily_reach(kind, entity_id, [stat.date for stat in stats])
+    for stat in stats:
+        stat.reach = reach[stat.date]
+
+    return stats
+
+
+def _fill_days(
+    stats: list[schemas.CampaignStatDaily],
+    filters: schemas.DailyStatFilters,
+) -> Iterator[schemas.CampaignStatDaily]:
+    if filters.from_date is None or filters.to_date is None:
+        yield from stats
+        return
+
+    to_date = filters.to_date
+    if filters.limit is not None:
+        to_date = min(to_date, filters.from_date + filters.limit - 1)
+
+    by_date = {stat.date: stat for stat in stats}
+    for date in range(filters.from_date, to_date + 1):
+        yield by_date.get(date) or schemas.CampaignStatDaily(
+            date=date,
+            impressions_count=0,
+            clicks_count=0,
+            spent_impressions=0,
+            spent_clicks=0,
+        )
+
+
 @router.get(
     "/campaigns/{campaign_id}",
     response={
@@ -22,18 +82,19 @@ router = Router(tags=["Statistics"])
     },
 )
 def get_campaign_stat(request: HttpRequest, campaign_id: uuid.UUID):
-    campaign = get_object_or_404(Campaign, id=campaign_id)
-    impressions = Impression.objects.filter(campaign=campaign)
-    clicks = Click.objects.filter(campaign=campaign)
-
-    campaign.spent_impressions = impressions.aggregate(Sum("cost", default=0))[
-        "cost__sum"
-    ]
-    campaign.spent_clicks = clicks.aggregate(Sum("cost", default=0))[
-        "cost__sum"
-    ]
+    def compute() -> schemas.CampaignStat:
+        sums = _daily_sums("daily_stats__")
+        campaigns = Campaign.objects.annotate(
+            spent_impressions=sums["spent_impressions"],
+            spent_clicks=sums["spent_clicks"],
+        )
+        stat = schemas.CampaignStat.from_orm(
+            get_object_or_404(campaigns, id=campaign_id)
+        )
+        stat.reach = get_reach("campaign", campaign_id)
+        return stat
 
-    return campaign
+    return get_or_set_stats("campaign", campaign_id, "total", compute)
 
 
 @router.get(
@@ -44,25 +105,17 @@ def get_campaign_stat(request: HttpRequest, campaign_id: uuid.UUID):
     },
 )
 def get_advertiser_stat(request: HttpRequest, advertiser_id: uuid.UUID):
-    advertiser = get_object_or_404(Advertiser, id=advertiser_id)
-    campaigns = Campaign.objects.filter(advertiser=advertiser)
-
-    impressions = Impression.objects.filter(campaign__in=campaigns)
-    clicks = Click.objects.filter(campaign__in=campaigns)
+    def compute() -> schemas.AdvertiserCampaignStat:
+        advertisers = Advertiser.objects.annotate(
+            **_daily_sums("daily_stats__")
+        )
+        stat = schemas.AdvertiserCampaignStat.from_orm(
+            get_object_or_404(advertisers, id=advertiser_id)
+        )
+        stat.reach = get_reach("advertiser", advertiser_id)
+        return stat
 
-    impressions_count = impressions.count()
-    clicks_count = clicks.count()
-
-    spent_impressions = impressions.aggregate(Sum("cost", default=0))[
-        "cost__sum"
-    ]
-    spent_clicks = clicks.aggregate(Sum("cost", default=0))["cost__sum"]
-    return schemas.AdvertiserCampaignStat(
-        impressions_count=impressions_count,
-        clicks_count=clicks_count,
-        spent_impressions=spent_impressions,
-        spent_clicks=spent_clicks,
-    )
+    return get_or_set_stats("advertiser", advertiser_id, "total", compute)
 
 
 @router.get(
@@ -72,58 +125,26 @@ def get_advertiser_stat(request: HttpRequest, advertiser_id: uuid.UUID):
         status.NOT_FOUND: error_schemas.NotFoundError,
     },
 )
-def get_campaign_stat_daily(request: HttpRequest, campaign_id: uuid.UUID):
-    campaign = get_object_or_404(Campaign, id=campaign_id)
-    impressions = Impression.objects.filter(campaign=campaign)
-    clicks = Click.objects.filter(campaign=campaign)
-
-    impressions_days = (
-        impressions.values("date")
-        .order_by("date")
-        .annotate(
-            impressions_count=Count("id"), total_impressions_sum=Sum("cost")
+def get_campaign_stat_daily(
+    request: HttpRequest,
+    campaign_id: uuid.UUID,
+    filters: schemas.DailyStatFilters = Query(...),  # noqa: B008
+):
+    def compute() -> list[schemas.CampaignStatDaily]:
+        stats = _filter_days(
+            CampaignDailyStat.objects.filter(campaign_id=campaign_id),
+            filters,
+            "campaign",
+            campaign_id,
         )
-    )
-    clicks_days = (
-        clicks.values("date")
-        .order_by("date")
-        .annotate(click_count=Count("id"), total_click_sum=Sum("cost"))
-    )
-
-    result = defaultdict(
-        lambda: {
-            "impressions_count": 0,
-            "clicks_count": 0,
-            "spent_impressions": 0.0,
-            "spent_clicks":  0.0
-        }
-    )
+        if not stats:
+            get_object_or_404(Campaign.objects.only("id"), id=campaign_id)
+        return stats
 
-    for entry in impressions_days:
-        date = entry["date"]
-        result[date]["impressions_count"] += entry["impressions_count"]
-        result[date]["spent_impressions"] += entry["total_impressions_sum"]
-
-    for entry in clicks_days:
-        date = entry["date"]
-        result[date]["clicks_count"] += entry["click_count"]
-        result[date]["spent_clicks"] += entry["total_click_sum"]
-
-    result = dict(result)
-
-    response = []
-    for date, data in result.items():
-        response.append(
-            schemas.CampaignStatDaily(
-                impressions_count=data["impressions_count"],
-                clicks_count=data["clicks_count"],
-                spent_clicks=data["spent_clicks"],
-                spent_impressions=data["spent_impressions"],
-                date=date,
-            )
-        )
+    name = f"daily:{filters.from_date}:{filters.to_date}:{filters.limit}"
+    stats = get_or_set_stats("campaign", campaign_id, name, compute)
 
-    return response
+    return _fill_days(stats, filters)
 
 
 @router.get(
@@ -133,57 +154,64 @@ def get_campaign_stat_daily(request: HttpRequest, campaign_id: uuid.UUID):
         status.NOT_FOUND: error_schemas.NotFoundError,
     },
 )
-def get_advertiser_stat_daily(request: HttpRequest, advertiser_id: uuid.UUID):
-    advertiser = get_object_or_404(Advertiser, id=advertiser_id)
-    campaigns = Campaign.objects.filter(advertiser=advertiser)
-
-    impressions = Impression.objects.filter(campaign__in=campaigns)
-    clicks = Click.objects.filter(campaign__in=campaigns)
-
-    impressions_days = (
-        impressions.values("date")
-        .order_by("date")
-        .annotate(
-            impressions_count=Count("id"), total_impressions_sum=Sum("cost")
+def get_advertiser_stat_daily(
+    request: HttpRequest,
+    advertiser_id: uuid.UUID,
+    filters: schemas.DailyStatFilters = Query(...),  # noqa: B008
+):
+    def compute() -> list[schemas.CampaignStatDaily]:
+        stats = _filter_days(
+            CampaignDailyStat.objects.filter(advertiser_id=advertiser_id)
+            .values("date")
+            .annotate(**_daily_sums()),
+            filters,
+            "advertiser",
+            advertiser_id,
         )
-    )
-    clicks_days = (
-        clicks.values("date")
-        .order_by("date")
-        .annotate(click_count=Count("id"), total_click_sum=Sum("cost"))
-    )
+        if not stats:
+            get_object_or_404(Advertiser.objects.only("id"), id=advertiser_id)
+        return stats
+
+    name = f"daily:{filters.from_date}:{filters.to_date}:{filters.limit}"
+    stats = get_or_set_stats("advertiser", advertiser_id, name, compute)
 
-    result = defaultdict(
-        lambda: {
-            "impressions_count": 0,
-            "clicks_count": 0,
-            "spent_impressions": 0.0,
-            "spent_clicks": 0.0,
-        }
+    return _fill_days(stats, filters)
+
+
+@router.get(
+    "/campaigns/{campaign_id}/events.ndjson",
+    response={
+        status.OK: None,
+        status.NOT_FOUND: error_schemas.NotFoundError,
+    },
+)
+def export_campaign_events_ndjson(
+    request: HttpRequest, campaign_id: uuid.UUID
+):
+    get_object_or_404(Campaign.objects.only("id"), id=campaign_id)
+
+    return StreamingHttpResponse(
+        export.iter_ndjson(campaign_id),
+        content_type="application/x-ndjson",
     )
 
-    for entry in impressions_days:
-        date = entry["date"]
-        result[date]["impressions_count"] += entry["impressions_count"]
-        result[date]["spent_impressions"] += entry["total_impressions_sum"]
-
-    for entry in clicks_days:
-        date = entry["date"]
-        result[date]["clicks_count"] += entry["click_count"]
-        result[date]["spent_clicks"] += entry["total_click_sum"]
-
-    result = dict(result)
-
-    response = []
-    for date, data in result.items():
-        response.append(
-            schemas.CampaignStatDaily(
-                impressions_count=data["impressions_count"],
-                clicks_count=data["clicks_count"],
-                spent_clicks=data["spent_clicks"],
-                spent_impressions=data["spent_impressions"],
-                date=date,
-            )
-        )
 
-    return response
+@router.get(
+    "/campaigns/{campaign_id}/events.csv",
+    response={
+        status.OK: None,
+        status.NOT_FOUND: error_schemas.NotFoundError,
+    },
+)
+def export_campaign_events_csv(request: HttpRequest, campaign_id: uuid.UUID):
+    get_object_or_404(Campaign.objects.only("id"), id=campaign_id)
+
+    return StreamingHttpResponse(
+        export.iter_csv(campaign_id),
+        content_type="text/csv",
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{campaign_id}-events.csv"'
+            ),
+        },
+    )
@@ -0,0 +1,77 @@
+import time
+import uuid
+from collections.abc import Callable, Iterable
+from typing import TypeVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+LOCK_TIMEOUT = 10
+LOCK_POLL_INTERVAL = 0.05
+
+T = TypeVar("T")
+
+
+def _version_key(kind: str, entity_id: uuid.UUID) -> str:
+    return f"stats_version:{kind}:{entity_id}"
+
+
+def get_stats_version(kind: str, entity_id: uuid.UUID) -> str:
+    return cache.get(_version_key(kind, entity_id), default="0")
+
+
+def _bump_versions(keys: list[str]) -> None:
+    version = uuid.uuid4().hex
+    cache.set_many(dict.fromkeys(keys, version), timeout=None)
+
+
+def bump_stats_versions(
+    campaign_ids: Iterable[uuid.UUID],
+    advertiser_ids: Iterable[uuid.UUID],
+) -> None:
+    keys = [
+        _version_key("campaign", campaign_id) for campaign_id in campaign_ids
+    ]
+    keys += [
+        _version_key("advertiser", advertiser_id)
+        for advertiser_id in advertiser_ids
+    ]
+    if not keys:
+        return
+
+    _bump_versions(keys)
+    if connection.in_atomic_block:
+        # A request that read the old rows between the first bump and the
+        # commit may have cached them under the new version.
+        transaction.on_commit(lambda: _bump_versions(keys))
+
+
+def get_or_set_stats(
+    kind: str,
+    entity_id: uuid.UUID,
+    name: str,
+    compute: Callable[[], T],
+) -> T:
+    version = get_stats_version(kind, entity_id)
+    key = f"stats:{name}:{entity_id}:{version}"
+    lock_key = f"{key}:lock"
+    deadline = time.monotonic() + LOCK_TIMEOUT
+
+    value = cache.get(key)
+    while value is None and not cache.add(lock_key, 1, timeout=LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            return compute()
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key)
+
+    if value is not None:
+        return value
+
+    try:
+        value = compute()
+        cache.set(key, value, timeout=settings.STATS_CACHE_TIMEOUT)
+    finally:
+        cache.delete(lock_key)
+
+    return value
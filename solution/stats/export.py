@@ -0,0 +1,51 @@
+import csv
+import json
+import uuid
+from collections.abc import Iterator
+
+from advertisers.models import (
+    Click,
+    ClickArchive,
+    Impression,
+    ImpressionArchive,
+)
+
+CHUNK_SIZE = 2000
+
+EVENT_FIELDS = ("client_id", "campaign_id", "advertiser_id", "date", "cost")
+EXPORT_FIELDS = ("event", *EVENT_FIELDS)
+
+
+class _Echo:
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_events(campaign_id: uuid.UUID) -> Iterator[tuple]:
+    for event, model in (
+        ("impression", ImpressionArchive),
+        ("impression", Impression),
+        ("click", ClickArchive),
+        ("click", Click),
+    ):
+        rows = (
+            model.objects.filter(campaign_id=campaign_id)
+            .order_by("id")
+            .values_list(*EVENT_FIELDS)
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        for row in rows:
+            yield (event, *row)
+
+
+def iter_ndjson(campaign_id: uuid.UUID) -> Iterator[str]:
+    for row in iter_events(campaign_id):
+        event = dict(zip(EXPORT_FIELDS, row, strict=True))
+        yield json.dumps(event, default=str) + "\n"
+
+
+def iter_csv(campaign_id: uuid.UUID) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in iter_events(campaign_id):
+        yield writer.writerow(row)
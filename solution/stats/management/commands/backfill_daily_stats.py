@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from stats.models import CampaignDailyStat
+from stats.rollup import backfill
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the CampaignDailyStat rollup from the raw Impression and "
+        "Click tables. Writes to both tables are blocked while it runs."
+    )
+
+    def handle(self, *args: str, **options: str) -> None:
+        with transaction.atomic():
+            backfill()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Backfilled {CampaignDailyStat.objects.count()} daily stats"
+            )
+        )
@@ -1,95 +1,250 @@
-from prometheus_client import Counter, Gauge
+import logging
+from collections.abc import Iterator
 
-campaign_impressions = Counter(
-    "campaign_impressions_total",
-    "Общее количество показов кампании",
-    ["campaign_id"],
-)
-campaign_clicks = Counter(
-    "campaign_clicks_total",
-    "Общее количество кликов по кампании",
-    ["campaign_id"],
-)
-campaign_conversion = Gauge(
-    "campaign_conversion", "Конверсия кампании в процентах", ["campaign_id"]
-)
-campaign_spent_impressions = Gauge(
-    "campaign_spent_impressions", "Затраты на показы кампании", ["campaign_id"]
-)
-campaign_spent_clicks = Gauge(
-    "campaign_spent_clicks", "Затраты на клики кампании", ["campaign_id"]
-)
-campaign_spent_total = Gauge(
-    "campaign_spent_total", "Общие затраты на кампанию", ["campaign_id"]
-)
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import Case, CharField, Sum, Value, When
+from django.db.models.functions import Cast
+from prometheus_client import REGISTRY, Counter
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
 
-campaign_daily_impressions = Counter(
-    "campaign_daily_impressions_total",
-    "Ежедневное количество показов кампании",
-    ["campaign_id", "date"],
-)
-campaign_daily_clicks = Counter(
-    "campaign_daily_clicks_total",
-    "Ежедневное количество кликов по кампании",
-    ["campaign_id", "date"],
-)
-campaign_daily_conversion = Gauge(
-    "campaign_daily_conversion",
-    "Ежедневная конверсия кампании в процентах",
-    ["campaign_id", "date"],
-)
-campaign_daily_spent_impressions = Gauge(
-    "campaign_daily_spent_impressions",
-    "Ежедневные затраты на показы кампании",
-    ["campaign_id", "date"],
-)
-campaign_daily_spent_clicks = Gauge(
-    "campaign_daily_spent_clicks",
-    "Ежедневные затраты на клики кампании",
-    ["campaign_id", "date"],
-)
-campaign_daily_spent_total = Gauge(
-    "campaign_daily_spent_total",
-    "Ежедневные общие затраты на кампанию",
-    ["campaign_id", "date"],
-)
+from stats.models import CampaignDailyStat
+from time_emulation.cache import get_date
 
-advertiser_impressions = Counter(
-    "advertiser_impressions_total",
-    "Общее количество показов рекламодателя",
-    ["advertiser_id"],
-)
-advertiser_clicks = Counter(
-    "advertiser_clicks_total",
-    "Общее количество кликов рекламодателя",
-    ["advertiser_id"],
-)
-advertiser_conversion = Gauge(
-    "advertiser_conversion",
-    "Конверсия рекламодателя в процентах",
-    ["advertiser_id"],
-)
-advertiser_spent_total = Gauge(
-    "advertiser_spent_total", "Общие затраты рекламодателя", ["advertiser_id"]
-)
+logger = logging.getLogger(__name__)
 
-advertiser_daily_impressions = Counter(
-    "advertiser_daily_impressions_total",
-    "Ежедневное количество показов рекламодателя",
-    ["advertiser_id", "date"],
-)
-advertiser_daily_clicks = Counter(
-    "advertiser_daily_clicks_total",
-    "Ежедневное количество кликов рекламодателя",
-    ["advertiser_id", "date"],
-)
-advertiser_daily_conversion = Gauge(
-    "advertiser_daily_conversion",
-    "Ежедневная конверсия рекламодателя в процентах",
-    ["advertiser_id", "date"],
-)
-advertiser_daily_spent_total = Gauge(
-    "advertiser_daily_spent_total",
-    "Ежедневные общие затраты рекламодателя",
-    ["advertiser_id", "date"],
+OTHER = "other"
+
+client_cache_lookups = Counter(
+    "client_cache_lookups_total",
+    "Обращения к кэшу профилей клиентов: local, redis или miss",
+    ["result"],
 )
+
+STATS_EVENTS = {
+    "campaign": (
+        ["campaign_id"],
+        {
+            "impressions": "Общее количество показов кампании",
+            "clicks": "Общее количество кликов по кампании",
+        },
+    ),
+    "advertiser": (
+        ["advertiser_id"],
+        {
+            "impressions": "Общее количество показов рекламодателя",
+            "clicks": "Общее количество кликов рекламодателя",
+        },
+    ),
+    "campaign_daily": (
+        ["campaign_id", "date"],
+        {
+            "impressions": "Ежедневное количество показов кампании",
+            "clicks": "Ежедневное количество кликов по кампании",
+        },
+    ),
+    "advertiser_daily": (
+        ["advertiser_id", "date"],
+        {
+            "impressions": "Ежедневное количество показов рекламодателя",
+            "clicks": "Ежедневное количество кликов рекламодателя",
+        },
+    ),
+}
+
+STATS_GAUGES = {
+    "campaign": (
+        ["campaign_id"],
+        {
+            "conversion": "Конверсия кампании в процентах",
+            "spent_impressions": "Затраты на показы кампании",
+            "spent_clicks": "Затраты на клики кампании",
+            "spent_total": "Общие затраты на кампанию",
+        },
+    ),
+    "campaign_daily": (
+        ["campaign_id", "date"],
+        {
+            "conversion": "Ежедневная конверсия кампании в процентах",
+            "spent_impressions": "Ежедневные затраты на показы кампании",
+            "spent_clicks": "Ежедневные затраты на клики кампании",
+            "spent_total": "Ежедневные общие затраты на кампанию",
+        },
+    ),
+    "advertiser": (
+        ["advertiser_id"],
+        {
+            "conversion": "Конверсия рекламодателя в процентах",
+            "spent_total": "Общие затраты рекламодателя",
+        },
+    ),
+    "advertiser_daily": (
+        ["advertiser_id", "date"],
+        {
+            "conversion": "Ежедневная конверсия рекламодателя в процентах",
+            "spent_total": "Ежедневные общие затраты рекламодателя",
+        },
+    ),
+}
+
+
+def _top_ids(field: str, size: int, from_date: int) -> set[str]:
+    ids = (
+        CampaignDailyStat.objects.filter(date__gte=from_date)
+        .values(field)
+        .annotate(impressions=Sum("impressions_count"))
+        .order_by("-impressions")
+        .values_list(field, flat=True)[:size]
+    )
+    return {str(entity_id) for entity_id in ids}
+
+
+def get_top_labels() -> dict[str, set[str]]:
+    top = cache.get("metrics_top_labels")
+    if top is None:
+        from_date = get_date() - settings.METRICS_RETENTION_DAYS + 1
+        top = {
+            "campaign": _top_ids(
+                "campaign_id", settings.METRICS_TOP_CAMPAIGNS, from_date
+            ),
+            "advertiser": _top_ids(
+                "advertiser_id", settings.METRICS_TOP_ADVERTISERS, from_date
+            ),
+        }
+        cache.set(
+            "metrics_top_labels", top, timeout=settings.METRICS_CACHE_TIMEOUT
+        )
+
+    return top
+
+
+def _label(field: str, ids: set[str]) -> Case:
+    return Case(
+        When(**{f"{field}__in": list(ids)}, then=Cast(field, CharField())),
+        default=Value(OTHER),
+        output_field=CharField(),
+    )
+
+
+def _aggregate_stats() -> dict[str, dict[tuple, list]]:
+    """
+    Sums the rollup per scope in SQL, with the campaigns and advertisers
+    outside the top sets grouped under "other".
+    """
+    top = get_top_labels()
+    from_date = get_date() - settings.METRICS_RETENTION_DAYS + 1
+    daily = CampaignDailyStat.objects.filter(date__gte=from_date)
+    sums = {
+        "total_impressions": Sum("impressions_count"),
+        "total_clicks": Sum("clicks_count"),
+        "total_spent_impressions": Sum("spent_impressions"),
+        "total_spent_clicks": Sum("spent_clicks"),
+    }
+
+    stats = {}
+    for kind, field in (
+        ("campaign", "campaign_id"),
+        ("advertiser", "advertiser_id"),
+    ):
+        label = _label(field, top[kind])
+        for scope, queryset, group in (
+            (kind, CampaignDailyStat.objects.all(), ["label"]),
+            (f"{kind}_daily", daily, ["label", "date"]),
+        ):
+            rows = (
+                queryset.annotate(label=label)
+                .values(*group)
+                .annotate(**sums)
+                .values_list(*group, *sums)
+            )
+            stats[scope] = {
+                tuple(str(value) for value in row[: len(group)]): list(
+                    row[len(group) :]
+                )
+                for row in rows
+            }
+
+    return stats
+
+
+def _stat_values(
+    impressions: int,
+    clicks: int,
+    spent_impressions: float,
+    spent_clicks: float,
+) -> dict[str, float]:
+    conversion = 0
+    if impressions > 0:
+        conversion = round(clicks / impressions * 100, 2)
+
+    return {
+        "impressions": impressions,
+        "clicks": clicks,
+        "conversion": conversion,
+        "spent_impressions": spent_impressions,
+        "spent_clicks": spent_clicks,
+        "spent_total": spent_impressions + spent_clicks,
+    }
+
+
+class StatsCollector(Collector):
+    """
+    Computes the impression, click, spend and conversion gauges from the
+    daily stats rollup when /metrics is scraped,
+    so they are the same whichever worker answers and cost nothing on the
+    serving path. Daily series are only exported for the last
+    METRICS_RETENTION_DAYS days. Only the top METRICS_TOP_CAMPAIGNS
+    campaigns and METRICS_TOP_ADVERTISERS advertisers by impressions get
+    their own label, the rest are summed under "other"; the series are
+    rebuilt on every collect, so no stale labels are left behind. Since the
+    top sets and the daily window move, a series can go down, which is why
+    the impression and click totals are gauges rather than counters. The
+    aggregates are shared between workers through the cache for one scrape
+    interval.
+    """
+
+    cache_key = "stats_metrics"
+
+    def _families(self) -> dict[tuple[str, str], GaugeMetricFamily]:
+        return {
+            (scope, value): GaugeMetricFamily(
+                f"{scope}_{value}", documentation, labels=labels
+            )
+            for metrics in (STATS_EVENTS, STATS_GAUGES)
+            for scope, (labels, values) in metrics.items()
+            for value, documentation in values.items()
+        }
+
+    def describe(self) -> Iterator[GaugeMetricFamily]:
+        yield from self._families().values()
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        stats = cache.get(self.cache_key)
+        if stats is None:
+            try:
+                stats = _aggregate_stats()
+            except DatabaseError:
+                logger.exception("Failed to aggregate stats metrics")
+                return
+            cache.set(
+                self.cache_key, stats, timeout=settings.METRICS_CACHE_TIMEOUT
+            )
+
+        families = self._families()
+        for scope, entries in stats.items():
+            names = [
+                *STATS_EVENTS.get(scope, ([], {}))[1],
+                *STATS_GAUGES[scope][1],
+            ]
+            for labels, totals in entries.items():
+                values = _stat_values(*totals)
+                for name in names:
+                    families[scope, name].add_metric(labels, values[name])
+
+        yield from families.values()
+
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
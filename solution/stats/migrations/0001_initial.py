@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('advertisers', '0007_impression_click_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.IntegerField()),
+                ('impressions_count', models.IntegerField(default=0)),
+                ('clicks_count', models.IntegerField(default=0)),
+                ('spent_impressions', models.FloatField(default=0)),
+                ('spent_clicks', models.FloatField(default=0)),
+                ('campaign', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='advertisers.campaign')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'date'), name='unique_campaign_daily_stat')],
+            },
+        ),
+    ]
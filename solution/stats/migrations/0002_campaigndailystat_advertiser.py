@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advertisers', '0008_impression_click_advertiser'),
+        ('stats', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaigndailystat',
+            name='advertiser',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='advertisers.advertiser'),
+        ),
+        migrations.RunSQL(
+            sql='UPDATE stats_campaigndailystat SET advertiser_id = campaign.advertiser_id'
+            ' FROM advertisers_campaign AS campaign'
+            ' WHERE stats_campaigndailystat.campaign_id = campaign.id',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='campaigndailystat',
+            name='advertiser',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='advertisers.advertiser'),
+        ),
+        migrations.AddIndex(
+            model_name='campaigndailystat',
+            index=models.Index(fields=['advertiser', 'date'], name='daily_stat_advertiser_date_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+BACKFILL_SQL = """
+DELETE FROM stats_campaigndailystat;
+
+INSERT INTO stats_campaigndailystat (
+    campaign_id, advertiser_id, date, impressions_count, clicks_count,
+    spent_impressions, spent_clicks
+)
+SELECT
+    events.campaign_id, campaign.advertiser_id, events.date,
+    SUM(events.impressions_count), SUM(events.clicks_count),
+    SUM(events.spent_impressions), SUM(events.spent_clicks)
+FROM (
+    SELECT campaign_id, date,
+        COUNT(*) AS impressions_count, 0 AS clicks_count,
+        SUM(cost) AS spent_impressions, 0 AS spent_clicks
+    FROM (
+        SELECT campaign_id, date, cost FROM advertisers_impression
+        UNION ALL
+        SELECT campaign_id, date, cost FROM advertisers_impressionarchive
+    ) AS impressions
+    GROUP BY campaign_id, date
+    UNION ALL
+    SELECT campaign_id, date, 0, COUNT(*), 0, SUM(cost)
+    FROM (
+        SELECT campaign_id, date, cost FROM advertisers_click
+        UNION ALL
+        SELECT campaign_id, date, cost FROM advertisers_clickarchive
+    ) AS clicks
+    GROUP BY campaign_id, date
+) AS events
+JOIN advertisers_campaign AS campaign ON campaign.id = events.campaign_id
+GROUP BY events.campaign_id, campaign.advertiser_id, events.date;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0002_campaigndailystat_advertiser'),
+        ('advertisers', '0011_drop_impression_click_advertiser_date_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
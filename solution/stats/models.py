@@ -0,0 +1,39 @@
+from django.db import models
+
+
+class CampaignDailyStat(models.Model):
+    campaign = models.ForeignKey(
+        "advertisers.Campaign",
+        related_name="daily_stats",
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    advertiser = models.ForeignKey(
+        "advertisers.Advertiser",
+        related_name="daily_stats",
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    date = models.IntegerField()
+
+    impressions_count = models.IntegerField(default=0)
+    clicks_count = models.IntegerField(default=0)
+    spent_impressions = models.FloatField(default=0)
+    spent_clicks = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["campaign", "date"],
+                name="unique_campaign_daily_stat",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["advertiser", "date"],
+                name="daily_stat_advertiser_date_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.campaign_id}/{self.date}"
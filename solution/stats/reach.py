@@ -0,0 +1,68 @@
+import logging
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable
+
+import redis
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+def _client() -> redis.Redis:
+    # Django's cache API has no PFADD/PFCOUNT, so the sketches go through
+    # the cache backend's own redis-py client and connection pool.
+    return cache._cache.get_client(write=True)  # noqa: SLF001
+
+
+def _reach_key(
+    kind: str, entity_id: uuid.UUID, date: int | None = None
+) -> str:
+    if date is None:
+        return cache.make_key(f"reach:{kind}:{entity_id}")
+    return cache.make_key(f"reach:{kind}:{entity_id}:{date}")
+
+
+def record_reach(
+    events: Iterable[tuple[uuid.UUID, uuid.UUID, int, uuid.UUID]],
+) -> None:
+    """
+    Adds the clients of (campaign_id, advertiser_id, date, client_id)
+    events to the HyperLogLog sketches of their campaign and advertiser,
+    overall and for the day. Redis failures are logged and the events are
+    left out of the reach estimate.
+    """
+    clients = defaultdict(set)
+    for campaign_id, advertiser_id, date, client_id in events:
+        for key in (
+            _reach_key("campaign", campaign_id),
+            _reach_key("campaign", campaign_id, date),
+            _reach_key("advertiser", advertiser_id),
+            _reach_key("advertiser", advertiser_id, date),
+        ):
+            clients[key].add(str(client_id))
+
+    if not clients:
+        return
+
+    try:
+        pipeline = _client().pipeline(transaction=False)
+        for key, client_ids in clients.items():
+            pipeline.pfadd(key, *client_ids)
+        pipeline.execute()
+    except redis.RedisError:
+        logger.exception("Failed to record reach of %d keys", len(clients))
+
+
+def get_reach(kind: str, entity_id: uuid.UUID) -> int:
+    return _client().pfcount(_reach_key(kind, entity_id))
+
+
+def get_daily_reach(
+    kind: str, entity_id: uuid.UUID, dates: list[int]
+) -> dict[int, int]:
+    pipeline = _client().pipeline(transaction=False)
+    for date in dates:
+        pipeline.pfcount(_reach_key(kind, entity_id, date))
+
+    return dict(zip(dates, pipeline.execute(), strict=True))
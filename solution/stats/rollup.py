@@ -0,0 +1,138 @@
+from collections import defaultdict
+from functools import partial
+
+from django.db import connection, transaction
+
+from advertisers.models import Advertiser, Campaign, Click, Impression
+from stats.cache import bump_stats_versions
+from stats.reach import record_reach
+
+UPSERT_SQL = """
+    INSERT INTO stats_campaigndailystat (
+        campaign_id, advertiser_id, date, impressions_count, clicks_count,
+        spent_impressions, spent_clicks
+    )
+    VALUES {values}
+    ON CONFLICT (campaign_id, date) DO UPDATE SET
+        impressions_count = (
+            stats_campaigndailystat.impressions_count
+            + EXCLUDED.impressions_count
+        ),
+        clicks_count = (
+            stats_campaigndailystat.clicks_count + EXCLUDED.clicks_count
+        ),
+        spent_impressions = (
+            stats_campaigndailystat.spent_impressions
+            + EXCLUDED.spent_impressions
+        ),
+        spent_clicks = (
+            stats_campaigndailystat.spent_clicks + EXCLUDED.spent_clicks
+        )
+"""
+
+BACKFILL_SQL = """
+    INSERT INTO stats_campaigndailystat (
+        campaign_id, advertiser_id, date, impressions_count, clicks_count,
+        spent_impressions, spent_clicks
+    )
+    SELECT
+        events.campaign_id, campaign.advertiser_id, events.date,
+        SUM(events.impressions_count), SUM(events.clicks_count),
+        SUM(events.spent_impressions), SUM(events.spent_clicks)
+    FROM (
+        SELECT campaign_id, date,
+            COUNT(*) AS impressions_count, 0 AS clicks_count,
+            SUM(cost) AS spent_impressions, 0 AS spent_clicks
+        FROM (
+            SELECT campaign_id, date, cost FROM advertisers_impression
+            UNION ALL
+            SELECT campaign_id, date, cost
+            FROM advertisers_impressionarchive
+        ) AS impressions
+        GROUP BY campaign_id, date
+        UNION ALL
+        SELECT campaign_id, date, 0, COUNT(*), 0, SUM(cost)
+        FROM (
+            SELECT campaign_id, date, cost FROM advertisers_click
+            UNION ALL
+            SELECT campaign_id, date, cost FROM advertisers_clickarchive
+        ) AS clicks
+        GROUP BY campaign_id, date
+    ) AS events
+    JOIN advertisers_campaign AS campaign ON campaign.id = events.campaign_id
+    GROUP BY events.campaign_id, campaign.advertiser_id, events.date
+"""
+
+
+def _upsert(rows: dict[tuple, list]) -> None:
+    if not rows:
+        return
+
+    # Concurrent flushes lock the rollup rows in the same order, so they
+    # cannot deadlock on each other.
+    values = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(rows))
+    params = [
+        value
+        for key, counters in sorted(rows.items())
+        for value in (*key, *counters)
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(UPSERT_SQL.format(values=values), params)
+
+
+def _bump_versions(events: list[Impression] | list[Click]) -> None:
+    bump_stats_versions(
+        {event.campaign_id for event in events},
+        {event.advertiser_id for event in events},
+    )
+
+
+def record_impressions(impressions: list[Impression]) -> None:
+    rows = defaultdict(lambda: [0, 0, 0.0, 0.0])
+    for impression in impressions:
+        row = rows[
+            impression.campaign_id, impression.advertiser_id, impression.date
+        ]
+        row[0] += 1
+        row[2] += impression.cost
+
+    _upsert(rows)
+    events = [
+        (
+            impression.campaign_id,
+            impression.advertiser_id,
+            impression.date,
+            impression.client_id,
+        )
+        for impression in impressions
+    ]
+    transaction.on_commit(partial(record_reach, events))
+    _bump_versions(impressions)
+
+
+def record_clicks(clicks: list[Click]) -> None:
+    rows = defaultdict(lambda: [0, 0, 0.0, 0.0])
+    for click in clicks:
+        row = rows[click.campaign_id, click.advertiser_id, click.date]
+        row[1] += 1
+        row[3] += click.cost
+
+    _upsert(rows)
+    _bump_versions(clicks)
+
+
+def backfill() -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "LOCK TABLE advertisers_impression, advertisers_click,"
+            " advertisers_impressionarchive, advertisers_clickarchive"
+            " IN SHARE MODE"
+        )
+        cursor.execute("DELETE FROM stats_campaigndailystat")
+        cursor.execute(BACKFILL_SQL)
+
+    bump_stats_versions(
+        Campaign.objects.values_list("id", flat=True),
+        Advertiser.objects.values_list("id", flat=True),
+    )
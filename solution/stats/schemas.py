@@ -1,4 +1,4 @@
-from ninja import Schema
+from ninja import Field, Schema
 from pydantic import computed_field
 
 
@@ -7,6 +7,7 @@ class BaseStat(Schema):
     clicks_count: int
     spent_impressions: float
     spent_clicks: float
+    reach: int = 0
 
     @computed_field
     @property
@@ -33,3 +34,9 @@ class AdvertiserCampaignStat(BaseStat): ...
 
 class AdvertiserCampaignStatDaily(BaseStat):
     date: int
+
+
+class DailyStatFilters(Schema):
+    from_date: int | None = Field(None, ge=0)
+    to_date: int | None = Field(None, ge=0)
+    limit: int | None = Field(None, gt=0)
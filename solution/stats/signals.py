@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from advertisers.models import Campaign, Click, Impression
+from stats.cache import bump_stats_versions
+from stats.rollup import record_clicks, record_impressions
+
+
+@receiver(post_save, sender=Impression)
+def impression_saved(
+    sender: type[Impression],
+    *,
+    instance: Impression,
+    created: bool,
+    **kwargs: object,
+) -> None:
+    if created:
+        record_impressions([instance])
+
+
+@receiver(post_save, sender=Click)
+def click_saved(
+    sender: type[Click],
+    *,
+    instance: Click,
+    created: bool,
+    **kwargs: object,
+) -> None:
+    if created:
+        record_clicks([instance])
+
+
+@receiver(post_save, sender=Campaign)
+@receiver(post_delete, sender=Campaign)
+def campaign_changed(
+    sender: type[Campaign], *, instance: Campaign, **kwargs: object
+) -> None:
+    bump_stats_versions([instance.id], [instance.advertiser_id])
@@ -1,9 +1,25 @@
 from http import HTTPStatus as status
 from django import test
-from advertisers.models import Campaign, Advertiser, Impression, Click
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from advertisers.compaction import compact_finished_campaigns
+from advertisers.models import (
+    Campaign,
+    Advertiser,
+    Impression,
+    Click,
+    ClickArchive,
+)
 from clients.models import Client
+from stats.metrics import StatsCollector
+from stats.models import CampaignDailyStat
 from time_emulation.cache import get_date
+import json
 import uuid
+from io import StringIO
+from redis import RedisError
+from unittest import mock
 
 
 class StatsTest(test.TestCase):
@@ -161,6 +177,124 @@ class StatsTest(test.TestCase):
         self.assertEqual(round(response.json()["spent_impressions"], 2), 0.3)
         self.assertEqual(response.json()["spent_clicks"], 3.0)
 
+    def test_stats_single_query(self):
+        advertiser_id = self.advertiser_data["advertiser_id"]
+        for url in (
+            f"{self.stats_prefix}/campaigns/{self.campaign_id}",
+            f"{self.stats_prefix}/campaigns/{self.campaign_id}/daily",
+            f"{self.stats_prefix}/advertisers/{advertiser_id}/campaigns",
+            f"{self.stats_prefix}/advertisers/{advertiser_id}/campaigns/daily",
+        ):
+            with self.subTest(url=url), self.assertNumQueries(1):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.OK)
+
+    def test_stats_cache_invalidated_by_impression(self):
+        url = f"{self.stats_prefix}/campaigns/{self.campaign_id}"
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(round(response.json()["spent_impressions"], 2), 0.3)
+
+        Impression.objects.create(
+            client=Client.objects.get(id=self.client_data["client_id"]),
+            campaign=Campaign.objects.get(id=self.campaign_id),
+            date=get_date(),
+            cost=0.1,
+        )
+
+        response = self.client.get(url)
+        self.assertEqual(round(response.json()["spent_impressions"], 2), 0.4)
+
+    def test_campaign_reach(self):
+        url = f"{self.stats_prefix}/campaigns/{self.campaign_id}"
+        campaign = Campaign.objects.get(id=self.campaign_id)
+        clients = [
+            Client.objects.get(id=self.client_data["client_id"]),
+            Client.objects.create(
+                id=uuid.uuid4(), login="user2", age=25, location="Moscow"
+            ),
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for client in clients:
+                Impression.objects.create(
+                    client=client, campaign=campaign, date=get_date(), cost=0.1
+                )
+
+        self.assertEqual(self.client.get(url).json()["reach"], 2)
+        daily = self.client.get(f"{url}/daily").json()
+        self.assertEqual(daily[0]["reach"], 2)
+
+    def test_reach_failure_keeps_impression(self):
+        campaign = Campaign.objects.get(id=self.campaign_id)
+        client = Client.objects.get(id=self.client_data["client_id"])
+
+        with (
+            mock.patch("stats.reach._client", side_effect=RedisError),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            Impression.objects.create(
+                client=client, campaign=campaign, date=get_date(), cost=0.1
+            )
+
+        self.assertEqual(Impression.objects.count(), 4)
+
+    def test_events_store_advertiser(self):
+        advertiser_id = uuid.UUID(self.advertiser_data["advertiser_id"])
+        self.assertEqual(
+            set(Impression.objects.values_list("advertiser_id", flat=True)),
+            {advertiser_id},
+        )
+        self.assertEqual(
+            set(Click.objects.values_list("advertiser_id", flat=True)),
+            {advertiser_id},
+        )
+
+    def test_stats_collector(self):
+        cache.delete_many(["metrics_top_labels", StatsCollector.cache_key])
+        families = {
+            family.name: family for family in StatsCollector().collect()
+        }
+
+        samples = {
+            sample.labels["campaign_id"]: sample.value
+            for sample in families["campaign_spent_total"].samples
+        }
+        self.assertEqual(round(samples[self.campaign_id], 2), 3.3)
+        samples = {
+            (sample.labels["campaign_id"], sample.labels["date"]): sample.value
+            for sample in families["campaign_daily_clicks"].samples
+        }
+        self.assertEqual(samples[self.campaign_id, str(get_date() + 1)], 2)
+
+    @test.override_settings(METRICS_TOP_CAMPAIGNS=0)
+    def test_stats_collector_other_label(self):
+        cache.delete_many(["metrics_top_labels", StatsCollector.cache_key])
+        families = {
+            family.name: family for family in StatsCollector().collect()
+        }
+
+        self.assertEqual(
+            {
+                sample.labels["campaign_id"]
+                for sample in families["campaign_conversion"].samples
+            },
+            {"other"},
+        )
+        self.assertEqual(
+            [
+                (sample.labels["campaign_id"], sample.value)
+                for sample in families["campaign_impressions"].samples
+            ],
+            [("other", 3)],
+        )
+
+    def test_export_metrics(self):
+        response = self.client.get("/metrics/metrics")
+        self.assertEqual(response.status_code, status.OK)
+        self.assertIn(b"campaign_spent_total", response.content)
+
     def test_get_advertiser_stat_no_campaigns(self):
         new_advertiser = {
             "advertiser_id": "4fa85f64-5717-4562-b3fc-2c963f66afa6",
@@ -214,6 +348,97 @@ class StatsTest(test.TestCase):
         self.assertEqual(round(day2_data["spent_impressions"], 2), 0.1)
         self.assertEqual(day2_data["spent_clicks"], 2.0)
 
+    def test_backfill_daily_stats(self):
+        rollup = list(
+            CampaignDailyStat.objects.order_by("date").values_list(
+                "date", "impressions_count", "clicks_count"
+            )
+        )
+        CampaignDailyStat.objects.all().delete()
+
+        call_command("backfill_daily_stats", stdout=StringIO())
+
+        self.assertEqual(
+            list(
+                CampaignDailyStat.objects.order_by("date").values_list(
+                    "date", "impressions_count", "clicks_count"
+                )
+            ),
+            rollup,
+        )
+        self.assertEqual(rollup, [(get_date(), 2, 1), (get_date() + 1, 1, 2)])
+
+    def test_get_campaign_daily_stat_window(self):
+        day = get_date()
+        response = self.client.get(
+            f"{self.stats_prefix}/campaigns/{self.campaign_id}/daily",
+            {"from_date": day + 1, "to_date": day + 4, "limit": 2},
+        )
+        self.assertEqual(response.status_code, status.OK)
+        data = response.json()
+        self.assertEqual([item["date"] for item in data], [day + 1, day + 2])
+        self.assertEqual(data[0]["clicks_count"], 2)
+        self.assertEqual(data[1]["impressions_count"], 0)
+
+        response = self.client.get(
+            f"{self.stats_prefix}/advertisers/{self.advertiser_data['advertiser_id']}/campaigns/daily",
+            {"limit": 1},
+        )
+        self.assertEqual([item["date"] for item in response.json()], [day])
+
+    def test_export_campaign_events(self):
+        response = self.client.get(
+            f"{self.stats_prefix}/campaigns/{self.campaign_id}/events.ndjson"
+        )
+        self.assertEqual(response.status_code, status.OK)
+        events = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(
+            [event["event"] for event in events],
+            ["impression"] * 3 + ["click"] * 3,
+        )
+        self.assertEqual(events[0]["campaign_id"], self.campaign_id)
+
+        response = self.client.get(
+            f"{self.stats_prefix}/campaigns/{self.campaign_id}/events.csv"
+        )
+        self.assertEqual(response.status_code, status.OK)
+        rows = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            rows[0], "event,client_id,campaign_id,advertiser_id,date,cost"
+        )
+        self.assertEqual(len(rows), 7)
+
+    def test_compaction_keeps_stats_and_exports(self):
+        campaign = Campaign.objects.get(id=self.campaign_id)
+        archived = compact_finished_campaigns(
+            campaign.end_date + settings.COMPACTION_DELAY_DAYS + 1
+        )
+
+        self.assertEqual(archived["advertisers_impression"], 3)
+        self.assertFalse(Impression.objects.filter(campaign=campaign).exists())
+        self.assertEqual(
+            ClickArchive.objects.filter(campaign=campaign).count(), 3
+        )
+
+        response = self.client.get(
+            f"{self.stats_prefix}/campaigns/{self.campaign_id}"
+        )
+        self.assertEqual(response.json()["spent_clicks"], 3.0)
+        response = self.client.get(
+            f"{self.stats_prefix}/campaigns/{self.campaign_id}/events.csv"
+        )
+        rows = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(rows), 7)
+
+        CampaignDailyStat.objects.all().delete()
+        call_command("backfill_daily_stats", stdout=StringIO())
+        self.assertEqual(
+            CampaignDailyStat.objects.filter(campaign=campaign).count(), 2
+        )
+
     def test_get_campaign_daily_stat_no_data(self):
         # Создаем новую кампанию без показов и кликов
         new_campaign_data = {**self.campaign_data, "ad_title": "Empty Ad"}
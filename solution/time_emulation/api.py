@@ -1,6 +1,10 @@
+from django.conf import settings
 from django.http import HttpRequest
 from ninja import Router, errors
 
+from ads.index import campaign_index
+from advertisers.compaction import start_compaction
+from advertisers.partitions import create_partitions
 from time_emulation import schemas
 from time_emulation.cache import get_date, set_date
 
@@ -16,5 +20,11 @@ def set_data(
         raise errors.ValidationError(
             errors=["the set date cannot be less than the current one"]
         )
+    create_partitions(
+        payload.current_date,
+        payload.current_date + settings.PARTITION_DAYS,
+    )
     set_date(payload.current_date)
+    campaign_index.rebuild()
+    start_compaction(payload.current_date)
     return payload